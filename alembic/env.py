@@ -14,7 +14,7 @@ from core.config import settings
 from db.base import Base
 
 # Import all models so Alembic can detect them for autogenerate
-from db.models import User, TestCategory, Test, Booking, BookingItem, OTP, Address, Order
+from db.models import User, TestCategory, Test, TestTag, Booking, BookingItem, OTP, Address, Order, Notification
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,28 @@
+"""add_order_content_hash_index
+
+Revision ID: 0a9c3e5d7f21
+Revises: f2d6b8e3a947
+Create Date: 2026-10-17 15:51:03.118420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a9c3e5d7f21'
+down_revision: Union[str, Sequence[str], None] = 'f2d6b8e3a947'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_orders_content_hash', 'orders', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_content_hash', table_name='orders')
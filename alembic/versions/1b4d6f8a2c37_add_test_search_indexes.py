@@ -0,0 +1,52 @@
+"""add_test_search_indexes
+
+Revision ID: 1b4d6f8a2c37
+Revises: 0a9c3e5d7f21
+Create Date: 2026-10-17 17:36:29.402817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b4d6f8a2c37'
+down_revision: Union[str, Sequence[str], None] = '0a9c3e5d7f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match crud_test.SEARCH_DOCUMENT / CATEGORY_SEARCH_DOCUMENT
+TEST_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(sample_type, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'C')"
+)
+CATEGORY_SEARCH_DOCUMENT = "to_tsvector('simple'::regconfig, name)"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres only; other databases use the in-memory search index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_tests_search_document', 'tests', [sa.text(f'({TEST_SEARCH_DOCUMENT})')], unique=False, postgresql_using='gin')
+    op.create_index('ix_test_categories_search_document', 'test_categories', [sa.text(CATEGORY_SEARCH_DOCUMENT)], unique=False, postgresql_using='gin')
+    op.create_index('ix_tests_name_trgm', 'tests', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_tests_sample_type_trgm', 'tests', ['sample_type'], unique=False, postgresql_using='gin', postgresql_ops={'sample_type': 'gin_trgm_ops'})
+    op.create_index('ix_tests_description_trgm', 'tests', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+    op.create_index('ix_test_categories_name_trgm', 'test_categories', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_test_categories_name_trgm', table_name='test_categories')
+    op.drop_index('ix_tests_description_trgm', table_name='tests')
+    op.drop_index('ix_tests_sample_type_trgm', table_name='tests')
+    op.drop_index('ix_tests_name_trgm', table_name='tests')
+    op.drop_index('ix_test_categories_search_document', table_name='test_categories')
+    op.drop_index('ix_tests_search_document', table_name='tests')
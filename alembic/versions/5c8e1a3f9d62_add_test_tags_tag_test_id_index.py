@@ -0,0 +1,36 @@
+"""add_test_tags_tag_test_id_index
+
+Revision ID: 5c8e1a3f9d62
+Revises: 1b4d6f8a2c37
+Create Date: 2026-10-17 18:12:47.560193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8e1a3f9d62'
+down_revision: Union[str, Sequence[str], None] = '1b4d6f8a2c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the oldest row of each duplicated (tag, test_id) before making it unique
+    op.execute(
+        "DELETE FROM test_tags WHERE id NOT IN "
+        "(SELECT MIN(id) FROM test_tags GROUP BY tag, test_id)"
+    )
+    op.create_index('ix_test_tags_tag_test_id', 'test_tags', ['tag', 'test_id'], unique=True)
+    # Redundant with the composite index
+    op.drop_index(op.f('ix_test_tags_tag'), table_name='test_tags')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_test_tags_tag'), 'test_tags', ['tag'], unique=False)
+    op.drop_index('ix_test_tags_tag_test_id', table_name='test_tags')
@@ -0,0 +1,43 @@
+"""add_booking_price_snapshots
+
+Revision ID: 7e2b4d9c1a58
+Revises: 5c8e1a3f9d62
+Create Date: 2026-10-17 18:54:20.731946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2b4d9c1a58'
+down_revision: Union[str, Sequence[str], None] = '5c8e1a3f9d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('booking_items', sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=True))
+    op.add_column('booking_items', sa.Column('discounted_price', sa.Numeric(precision=10, scale=2), nullable=True))
+    op.add_column('bookings', sa.Column('total_amount', sa.Numeric(precision=10, scale=2), server_default='0', nullable=False))
+    # Existing items take the current test prices, the best record there is of what was booked
+    op.execute(
+        "UPDATE booking_items SET "
+        "price = (SELECT tests.price FROM tests WHERE tests.id = booking_items.test_id), "
+        "discounted_price = (SELECT tests.discounted_price FROM tests WHERE tests.id = booking_items.test_id)"
+    )
+    op.execute(
+        "UPDATE bookings SET total_amount = COALESCE("
+        "(SELECT SUM(booking_items.price) FROM booking_items WHERE booking_items.booking_id = bookings.id), 0)"
+    )
+    op.alter_column('booking_items', 'price', existing_type=sa.Numeric(precision=10, scale=2), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('bookings', 'total_amount')
+    op.drop_column('booking_items', 'discounted_price')
+    op.drop_column('booking_items', 'price')
@@ -0,0 +1,28 @@
+"""add_booking_date_status_index
+
+Revision ID: b7e2d9a4c1f3
+Revises: 6cb0196bee3c
+Create Date: 2026-10-17 10:12:41.204113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d9a4c1f3'
+down_revision: Union[str, Sequence[str], None] = '6cb0196bee3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_booking_date_status', 'bookings', ['booking_date', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_booking_date_status', table_name='bookings')
@@ -0,0 +1,32 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: c3a8f1e6d2b9
+Revises: b7e2d9a4c1f3
+Create Date: 2026-10-17 11:03:17.518962
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8f1e6d2b9'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d9a4c1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_created_at_id', 'bookings', ['created_at', 'id'], unique=False)
+    op.create_index('ix_bookings_user_id_created_at_id', 'bookings', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_addresses_user_id_id', 'addresses', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_addresses_user_id_id', table_name='addresses')
+    op.drop_index('ix_bookings_user_id_created_at_id', table_name='bookings')
+    op.drop_index('ix_bookings_created_at_id', table_name='bookings')
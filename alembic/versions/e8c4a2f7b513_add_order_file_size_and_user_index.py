@@ -0,0 +1,30 @@
+"""add_order_file_size_and_user_index
+
+Revision ID: e8c4a2f7b513
+Revises: d5b1e7c94a20
+Create Date: 2026-10-17 14:22:41.306517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c4a2f7b513'
+down_revision: Union[str, Sequence[str], None] = 'd5b1e7c94a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('file_size', sa.Integer(), nullable=True))
+    op.create_index('ix_orders_user_id_created_at_id', 'orders', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_user_id_created_at_id', table_name='orders')
+    op.drop_column('orders', 'file_size')
@@ -0,0 +1,28 @@
+"""add_order_content_hash
+
+Revision ID: f2d6b8e3a947
+Revises: e8c4a2f7b513
+Create Date: 2026-10-17 15:08:12.774203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d6b8e3a947'
+down_revision: Union[str, Sequence[str], None] = 'e8c4a2f7b513'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('orders', 'content_hash')
@@ -1,14 +1,17 @@
+import hashlib
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.config import settings
 from db.session import get_db
 from db.models.user import User
 from schemas.token import TokenPayload
 from crud import crud_user
+from crud.pagination import next_cursor
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
@@ -28,7 +31,7 @@ async def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = await crud_user.get(db, id=token_data.sub)
+    user = await crud_user.get_cached(db, id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -66,3 +69,60 @@ def get_current_admin_or_staff_user(
             status_code=400, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+class ConditionalGet:
+    """
+    Opt-in conditional GET, used as a dependency. Call check(version) before building
+    the body: it sets a strong ETag and, when If-None-Match already holds it, ends
+    the request with a bodyless 304.
+    """
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+
+    def check(self, version: str, private: bool = False) -> None:
+        etag = f'"{version}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache" if private else "no-cache"}
+        self.response.headers.update(headers)
+        if_none_match = self.request.headers.get("if-none-match")
+        if not if_none_match:
+            return
+        # If-None-Match uses weak comparison, so W/ prefixes are ignored
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def row_version(*rows) -> str:
+    """
+    Hash of the column values of ORM rows (or of plain values), a version for a
+    response built from them.
+    """
+    digest = hashlib.sha256()
+    for row in rows:
+        state = inspect(row, raiseerr=False)
+        if state is None:
+            digest.update(repr(row).encode("utf-8"))
+        else:
+            digest.update(state.mapper.class_.__tablename__.encode("utf-8"))
+            for attr in state.mapper.column_attrs:
+                digest.update(b"\0" + repr(getattr(row, attr.key)).encode("utf-8"))
+        digest.update(b"\1")
+    return digest.hexdigest()[:32]
+
+
+def set_catalog_version(response: Response, snapshot) -> None:
+    """
+    Expose the catalog version a response was served from.
+    """
+    response.headers["X-Catalog-Version"] = snapshot.version
+
+
+def set_next_cursor(response: Response, items, keys, limit: int) -> None:
+    """
+    Expose the keyset cursor of the next page of a list endpoint, if there is one.
+    """
+    cursor = next_cursor(items, keys, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from db.session import get_db
 from schemas.address import Address, AddressCreate, AddressUpdate
 from crud import crud_address
@@ -23,11 +23,15 @@ async def create_address(
 @router.get("/user/{user_id}", response_model=List[Address])
 async def read_addresses_by_user(
     user_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    return await crud_address.get_multi_by_user(db, user_id=user_id, skip=skip, limit=limit)
+    addresses = await crud_address.get_multi_by_user(db, user_id=user_id, skip=skip, limit=limit, cursor=cursor)
+    deps.set_next_cursor(response, addresses, crud_address.PAGE_KEYS, limit)
+    return addresses
 
 @router.get("/{address_id}", response_model=Address)
 async def read_address(
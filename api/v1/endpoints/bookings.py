@@ -1,6 +1,6 @@
 from crud.crud_order import CrudOrder
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
@@ -28,24 +28,28 @@ router = APIRouter()
 
 @router.get("/", response_model=List[BookingSchema])
 async def read_bookings(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve bookings.
+    Retrieve bookings, newest first.
+    Pass the X-Next-Cursor response header back as cursor to get the next page.
     """
     if (
         current_user.is_superuser
         or current_user.role == "ADMIN"
         or current_user.role == "STAFF"
     ):
-        bookings = await crud_booking.get_multi(db, skip=skip, limit=limit)
+        bookings = await crud_booking.get_multi(db, skip=skip, limit=limit, cursor=cursor)
     else:
         bookings = await crud_booking.get_multi_by_user(
-            db=db, user_id=current_user.id, skip=skip, limit=limit
+            db=db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor
         )
+    deps.set_next_cursor(response, bookings, crud_booking.PAGE_KEYS, limit)
     return bookings
 
 
@@ -108,10 +112,13 @@ async def get_bookings_by_phone(
     *,
     db: AsyncSession = Depends(get_db),
     phone_request: PhoneLookupRequest,
+    skip: int = 0,
+    limit: Optional[int] = None,
     current_user: User = Depends(deps.get_current_admin_or_staff_user),
 ) -> Any:
     """
     Get all bookings for a user by phone number (admin/staff/superuser only).
+    Bookings with status "done" are left out. Use skip/limit to paginate.
     """
     # Find user by phone number
     user = await crud_user.get_by_phone(db=db, phone=phone_request.phone)
@@ -120,29 +127,14 @@ async def get_bookings_by_phone(
             status_code=404, detail="User not found with this phone number"
         )
 
-    # Get all bookings for this user with test names
-    result = await db.execute(
-        select(BookingModel)
-        .options(selectinload(BookingModel.address))
-        .filter(BookingModel.user_id == user.id)
-        .order_by(BookingModel.created_at.desc())
+    # Get the bookings with address, items and tests in a fixed number of queries
+    bookings = await crud_booking.get_multi_by_user_with_tests(
+        db, user_id=user.id, exclude_status="done", skip=skip, limit=limit
     )
-    print("Result is:", result)
-    bookings = result.scalars().all()
 
     # Manually construct the response with test names
     booking_responses = []
     for booking in bookings:
-        # Get booking items with test names
-        if booking.status == "done":
-            continue
-        items_result = await db.execute(
-            select(BookingItemModel, Test.name)
-            .join(Test, BookingItemModel.test_id == Test.id)
-            .filter(BookingItemModel.booking_id == booking.id)
-        )
-        items_with_names = items_result.all()
-        # Construct booking response
         booking_dict = {
             "id": booking.id,
             "user_id": booking.user_id,
@@ -153,16 +145,19 @@ async def get_bookings_by_phone(
             "address_link": booking.address.google_maps_link if booking.address else "",
             "created_at": booking.created_at,
             "updated_at": booking.updated_at,
+            "total_amount": booking.total_amount,
             "items": [
                 {
                     "id": item.id,
                     "booking_id": item.booking_id,
                     "test_id": item.test_id,
-                    "test_name": test_name,
+                    "test_name": item.test.name if item.test else None,
+                    "price": item.price,
+                    "discounted_price": item.discounted_price,
                 }
-                for item, test_name in items_with_names
+                for item in booking.items
             ],
-            "booking_item_ids": [item.id for item, _ in items_with_names],
+            "booking_item_ids": [item.id for item in booking.items],
         }
         booking_responses.append(BookingSchema(**booking_dict))
 
@@ -283,90 +278,8 @@ async def get_upcoming_bookings(
         "created_at": "2026-01-25T10:30:00Z"
     }]
     """
-    # Fetch all orders for the current user
-    orders = await CrudOrder(db=db).get_orders_by_user(user_id=current_user.id)
-    
-    from datetime import timezone
-    import pytz
-    ist = pytz.timezone("Asia/Kolkata")
-
-    print("these are the orders", orders)
-    
-    # Group orders by booking_id
-    bookings_dict = {}
-    
-    for order in orders:
-        booking_id = order.booking_id
-        
-        # Initialize booking entry if not exists
-        if booking_id not in bookings_dict:
-            # Fetch booking details from the booking model
-            booking_model = await crud_booking.get(db, booking_id)
-            if not booking_model:
-                continue
-                
-            # Get address details
-            complete_address = await crud_address.get(db, booking_model.address_id)
-            
-            # Convert UTC to IST for display
-            utc_dt = booking_model.booking_date
-            local_time = utc_dt.astimezone(ist).strftime("%I:%M %p")
-            
-            # Build address string
-            address_parts = []
-            if complete_address.address_line1:
-                address_parts.append(complete_address.address_line1)
-            if complete_address.address_line2:
-                address_parts.append(complete_address.address_line2)
-            if complete_address.city:
-                address_parts.append(complete_address.city)
-            if complete_address.state:
-                address_parts.append(complete_address.state)
-            if complete_address.postal_code:
-                address_parts.append(complete_address.postal_code)
-            
-            bookings_dict[booking_id] = {
-                "id": booking_id,
-                "booking_date": booking_model.booking_date.date(),
-                "booking_time": local_time,
-                "status": booking_model.status,
-                "address": ", ".join(address_parts),
-                "address_link": complete_address.google_maps_link if complete_address.google_maps_link else "",
-                "tests": [],
-                "created_at": booking_model.created_at,
-            }
-        
-        # Fetch test details for this booking item
-        booking_item = await db.get(BookingItemModel, order.booking_item_id)
-        if booking_item:
-            test = await crud_test.get(db, booking_item.test_id)
-            if test:
-                # Add test with booking_item_id and file_link
-                bookings_dict[booking_id]["tests"].append({
-                    "id": test.id,
-                    "name": test.name,
-                    "sample_type": test.sample_type,
-                    "booking_item_id": order.booking_item_id,
-                    "file_link": order.file_link if order.file_link else None
-                })
-    
-    # Calculate total_amount for each booking and convert to list
-    result = []
-    for booking_data in bookings_dict.values():
-        # Get all test prices for this booking
-        test_prices = []
-        for test_info in booking_data["tests"]:
-            test = await crud_test.get(db, test_info["id"])
-            if test:
-                test_prices.append(test.price)
-        
-        booking_data["total_amount"] = sum(test_prices) if test_prices else 0.0
-        result.append(booking_data)
-    
-    # Sort by booking_date descending (most recent first)
-    result.sort(key=lambda x: x["created_at"], reverse=True)
-    
-    return result
+    # Bookings, addresses, tests and totals for all of the user's orders in one query
+    return await CrudOrder(db=db).get_bookings_with_tests_by_user(user_id=current_user.id)
 
 from pydantic import BaseModel, Field
 
@@ -378,108 +291,105 @@ class AdminBillingRequest(BaseModel):
     end_date: str = Field(..., description="End ISO date time string")
     
 from db.models.booking import Booking
-async def response_builder(bookings: List[Booking], db: AsyncSession) -> List[Any]:
-    result = []
-    for booking in bookings:
-        temp = {}
-        temp["booking_id"] = booking.id
-        customer = await crud_user.get(db, booking.user_id)
-        temp["customer"] = customer.full_name
-        temp["phone_number"] = customer.phone
-        temp["date"] = booking.booking_date
-        temp["status"] = booking.status
-        tests = await crud_test.get_tests_by_booking_id(db, booking.id)
-        temp["tests"] = [{
-            "id": test.id,
-            "name": test.name,
-            "sample_type": test.sample_type,
-            "price": test.price
-        } for test in tests]
-        temp["amount"] = sum(test.price for test in tests) if tests else 0.0
-        result.append(temp)
-    return result
+from crud import crud_billing
+from utils.date_windows import ist_window, window_criteria, parse_ist_datetime
+from db.session import AsyncSessionLocal
+from fastapi import Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+import csv
+import io
+import json
+
+BILLING_EXPORT_FORMATS = "^(csv|ndjson)$"
+BILLING_CSV_COLUMNS = ["booking_id", "customer", "phone_number", "date", "status", "tests", "amount"]
+
+
+def billing_export_response(export: str, *criteria, order_by=(Booking.booking_date.asc(),)) -> StreamingResponse:
+    """
+    Stream billing entries as CSV or NDJSON, one line per booking, straight from a
+    server-side cursor. The stream uses its own session because it outlives the handler.
+    """
+    def csv_line(values: list) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(values)
+        return buffer.getvalue()
+
+    async def csv_lines():
+        yield csv_line(BILLING_CSV_COLUMNS)
+        async with AsyncSessionLocal() as session:
+            async for entry in crud_billing.stream_billing(session, *criteria, order_by=order_by):
+                yield csv_line([
+                    entry["booking_id"],
+                    entry["customer"],
+                    entry["phone_number"],
+                    entry["date"].isoformat() if entry["date"] else "",
+                    entry["status"],
+                    "; ".join(test["name"] for test in entry["tests"]),
+                    entry["amount"],
+                ])
+
+    async def ndjson_lines():
+        async with AsyncSessionLocal() as session:
+            async for entry in crud_billing.stream_billing(session, *criteria, order_by=order_by):
+                yield json.dumps(jsonable_encoder(entry)) + "\n"
+
+    if export == "csv":
+        return StreamingResponse(
+            csv_lines(),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=billing.csv"},
+        )
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
 
 @router.post("/admin/billing")
 async def get_filtered_bookings(
     request: AdminBillingRequest,
+    export: Optional[str] = Query(None, pattern=BILLING_EXPORT_FORMATS, description="Stream the result as csv or ndjson"),
     db: AsyncSession = Depends(get_db),
     admin: User = Depends(deps.get_current_admin_user),
 ) -> Any:
 
-    # Parse ISO format strings and handle IST timezone
-    # IST is UTC+5:30
+    # Parse ISO format strings, naive values are taken to be IST
     try:
-        ist_tz = timezone(timedelta(hours=5, minutes=30))
-        
-        # Parse the ISO string
-        if request.start_date.endswith('Z'):
-            # Already in UTC
-            start_dt = datetime.fromisoformat(request.start_date.replace('Z', '+00:00'))
-        else:
-            # Assume IST if no timezone info, convert to UTC
-            start_dt = datetime.fromisoformat(request.start_date)
-            if start_dt.tzinfo is None:
-                start_dt = start_dt.replace(tzinfo=ist_tz)
-            start_dt = start_dt.astimezone(timezone.utc)
-        
-        if request.end_date.endswith('Z'):
-            # Already in UTC
-            end_dt = datetime.fromisoformat(request.end_date.replace('Z', '+00:00'))
-        else:
-            # Assume IST if no timezone info, convert to UTC
-            end_dt = datetime.fromisoformat(request.end_date)
-            if end_dt.tzinfo is None:
-                end_dt = end_dt.replace(tzinfo=ist_tz)
-            end_dt = end_dt.astimezone(timezone.utc)
-        filtered_bookings = await db.execute(select(Booking).where(
+        start_dt = parse_ist_datetime(request.start_date)
+        end_dt = parse_ist_datetime(request.end_date)
+        if export:
+            return billing_export_response(
+                export,
+                Booking.booking_date >= start_dt,
+                Booking.booking_date <= end_dt,
+            )
+        return await crud_billing.get_billing(
+            db,
             Booking.booking_date >= start_dt,
             Booking.booking_date <= end_dt,
-        ).order_by(Booking.booking_date.asc()))
-        result = await response_builder(filtered_bookings.scalars().all(), db)
-        return result
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format(must be ISO)/error occured in processing\n{e}")
 
 @router.get("/admin/billing/{date_str}")
 async def get_today_bookings(
     date_str: str,
+    export: Optional[str] = Query(None, pattern=BILLING_EXPORT_FORMATS, description="Stream the result as csv or ndjson"),
     db: AsyncSession = Depends(get_db),
     admin: User = Depends(deps.get_current_admin_user),
 ) -> Any:
-    from sqlalchemy import Date, cast
-    import pytz
-    ist = pytz.timezone("Asia/Kolkata")
-    now = datetime.now(ist)
-    if date_str == "today":
-        target_date = now.date()
-        result = await db.execute(select(Booking).where(
-            cast(Booking.booking_date, Date) == target_date
-        ))
-        bookings = result.scalars().all()
-        return await response_builder(bookings, db)
-    elif date_str == "month":
-          # Get current time in IST
-        first_day = now.replace(day=1).date()
-        last_day = (now.replace(day=1) + relativedelta(months=1) - timedelta(days=1)).date()
-        result = await db.execute(select(Booking).where(
-            cast(Booking.booking_date, Date) >= first_day,
-            cast(Booking.booking_date, Date) <= last_day
-        ).order_by(Booking.booking_date.asc()))
-        bookings = result.scalars().all()
-        return await response_builder(bookings, db)
+    order_by = (Booking.booking_date.asc(),)
+    if date_str in ("today", "month", "future"):
+        criteria = window_criteria(Booking.booking_date, ist_window(date_str))
     elif date_str == "pending":
-        past_confirmed_bookings = await db.execute(select(Booking).where(Booking.booking_date < now, Booking.status == "confirmed").order_by(Booking.booking_date.asc()))
-        bookings = past_confirmed_bookings.scalars().all()
-        return await response_builder(bookings, db)
-    elif date_str == "future":
-        future_bookings = await db.execute(select(Booking).where(Booking.booking_date >= now).order_by(Booking.booking_date.asc()))
-        bookings = future_bookings.scalars().all()
-        return await response_builder(bookings, db)
+        criteria = window_criteria(Booking.booking_date, ist_window(date_str))
+        criteria.append(Booking.status == "confirmed")
     elif date_str == "all":
-        all_bookings = await db.execute(select(Booking).order_by(Booking.booking_date.desc()))
-        bookings = all_bookings.scalars().all()
-        return await response_builder(bookings, db)
-    raise HTTPException(status_code=400, detail="Invalid date parameter")
+        criteria = []
+        order_by = (Booking.booking_date.desc(),)
+    else:
+        raise HTTPException(status_code=400, detail="Invalid date parameter")
+
+    if export:
+        return billing_export_response(export, *criteria, order_by=order_by)
+    return await crud_billing.get_billing(db, *criteria, order_by=order_by)
 
 class UpdateBookingStatusRequest(BaseModel):
     booking_id: int = Field(..., description="ID of the booking to update")
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from db.session import get_db
 from schemas.test_category import TestCategory, TestCategoryCreate, TestCategoryUpdate
-from crud import crud_test_category
+from crud import crud_test_category, crud_catalog
 from db.models.user import User
 from api import deps
 
@@ -11,22 +11,32 @@ router = APIRouter()
 
 @router.get("/all", response_model=List[TestCategory])
 async def get_all_categories_full(
+    response: Response,
+    conditional: deps.ConditionalGet = Depends(),
     db: AsyncSession = Depends(get_db),
     admin: User = Depends(deps.get_current_admin_user)
 ):
+    snapshot = await crud_catalog.get_snapshot(db)
+    deps.set_catalog_version(response, snapshot)
+    conditional.check(snapshot.version, private=True)
     try:
-        return await crud_test_category.get_all(db)
+        return await crud_catalog.get_categories(db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=List[str])
 async def get_all_categories(
+    response: Response,
+    conditional: deps.ConditionalGet = Depends(),
     db: AsyncSession = Depends(get_db),
     admin: User = Depends(deps.get_current_admin_user)
 ):
+    snapshot = await crud_catalog.get_snapshot(db)
+    deps.set_catalog_version(response, snapshot)
+    conditional.check(snapshot.version, private=True)
     try:
         result = []
-        categories = await crud_test_category.get_all(db)
+        categories = await crud_catalog.get_categories(db)
         for category in categories:
             result.append(category.name)
         return result
@@ -44,9 +54,11 @@ async def create_category(
 @router.get("/{category_id}", response_model=TestCategory)
 async def read_category(
     category_id: int,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
-    category = await crud_test_category.get(db, id=category_id)
+    deps.set_catalog_version(response, await crud_catalog.get_snapshot(db))
+    category = await crud_catalog.get_category(db, id=category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     return category
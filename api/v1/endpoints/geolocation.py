@@ -1,36 +1,68 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
 import httpx
+from api import deps
+from db.models.user import User
+from utils import geocoding
+from utils.pincode_gazetteer import get_gazetteer
 
 router = APIRouter()
 
 @router.get("/geocode")
 async def geocode(q: str):
-    async with httpx.AsyncClient() as client:
-        res = await client.get(
-            "https://nominatim.openstreetmap.org/search",
-            params={
-                "q": q,
-                "format": "json"
-            },
-            headers={
-                "User-Agent": "Diagnopet/1.0 (diagnopet.com)"
-            }
-        )
-        return res.json()
+    # A bare PIN code is answered from the gazetteer, without an upstream call
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        record = gazetteer.lookup(q)
+        if record is not None and record["lat"] is not None:
+            return gazetteer.as_geocode_result(record)
+    try:
+        return await geocoding.search(q)
+    except httpx.HTTPError as e:
+        print(f"Error in geocode: {e}")
+        raise HTTPException(status_code=502, detail="Geocoding service unavailable")
     
 @router.get("/reverse-geocode")
-async def reverse_geocode(lat: float, lon: float):
-    async with httpx.AsyncClient() as client:
-        res = await client.get(
-            "https://nominatim.openstreetmap.org/reverse",
-            params={
-                "format": "json",
-                "lat": lat,
-                "lon": lon
-            },
-            headers={
-                "User-Agent": "Diagnopet/1.0 (diagnopet.com)"
-            },
-            timeout=10
-        )
-        return res.json()
\ No newline at end of file
+async def reverse_geocode(lat: float = Query(..., ge=-90, le=90), lon: float = Query(..., ge=-180, le=180)):
+    try:
+        return await geocoding.reverse(lat, lon)
+    except httpx.HTTPError as e:
+        print(f"Error in reverse_geocode: {e}")
+        raise HTTPException(status_code=502, detail="Geocoding service unavailable")
+
+def _require_gazetteer():
+    gazetteer = get_gazetteer()
+    if gazetteer is None:
+        raise HTTPException(status_code=503, detail="PIN code lookup is not available")
+    return gazetteer
+
+@router.get("/pincodes")
+async def autocomplete_pincodes(
+    prefix: str = Query(..., min_length=1, max_length=6, pattern="^[0-9]+$"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    return _require_gazetteer().autocomplete(prefix, limit=limit)
+
+@router.get("/pincodes/validate")
+async def validate_pincode(
+    postal_code: str,
+    city: Optional[str] = None,
+    state: Optional[str] = None
+):
+    return _require_gazetteer().validate(postal_code, city=city, state=state)
+
+@router.get("/pincodes/{postal_code}")
+async def read_pincode(postal_code: str):
+    record = _require_gazetteer().lookup(postal_code)
+    if record is None:
+        raise HTTPException(status_code=404, detail="PIN code not found")
+    return record
+
+@router.get("/geocode/cache-stats")
+async def read_geocode_cache_stats(
+    admin: User = Depends(deps.get_current_admin_user),
+):
+    """
+    Hit/miss counters of the geocoding caches, to tune REVERSE_GEOCODE_PRECISION.
+    """
+    return geocoding.cache_stats()
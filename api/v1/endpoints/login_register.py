@@ -7,7 +7,7 @@ from schemas.address import AddressBase, AddressCreate
 from crud import crud_user
 from datetime import timedelta
 from core.config import settings
-from core.security import verify_password, create_access_token
+from core.security import verify_password_async, create_access_token
 from schemas.token import Token
 from schemas.user import UserLogin
 from crud import crud_otp
@@ -35,7 +35,7 @@ async def login(user_in: UserLogin, db: AsyncSession = Depends(get_db)):
     user = await crud_user.get_by_phone(db, phone=user_in.phone)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if not verify_password(user_in.password, user.hashed_password):
+    if not await verify_password_async(user_in.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect password")
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -109,6 +109,7 @@ async def verify_otp(payload: VerifyOtpRequest, db: AsyncSession = Depends(get_d
         user.is_verified = True
         db.add(user)
         await db.commit()
+        crud_user.user_cache.invalidate(user.id)
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -1,14 +1,28 @@
-from fastapi import APIRouter, UploadFile, Form, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, Form, File, HTTPException, Depends, Response
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from pydantic import TypeAdapter, ValidationError
+import asyncio
+import json
+import zipfile
 from db.session import get_db
-from utils.supabase_storage import upload_pdf, get_signed_url
-from utils.send_whatsapp_msg import send_message_via_twilio_with_media
+from utils.storage import upload_pdf, get_signed_url, get_signed_urls, get_storage_backend, LocalStorageBackend
+from utils.pdf_upload import PDFUploadStream
 import uuid
-from crud import crud_order, crud_user
-from schemas.order import OrderCreate
+from crud import crud_order, crud_user, crud_notification
+from crud.crud_order import report_storage_path
+from schemas.order import OrderCreate, ReportManifestEntry
+from core.config import settings
 router = APIRouter()
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+REPORT_MESSAGE_BODY = "Your medical report is ready. Please find it attached below."
+ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+
+
+def normalize_phone(phone_number: str) -> str:
+    return phone_number if phone_number.startswith("+91") else "+91" + phone_number
 
 
 from api.deps import get_current_admin_or_staff_user
@@ -28,11 +42,8 @@ async def upload_report(
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
 
     try:
-        # 1. Read file content
-        content = await file.read()
-
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="PDF too large")
+        # 1. Validate and hash the file, without loading it whole
+        pdf_stream = await PDFUploadStream(file, MAX_FILE_SIZE).open()
         
         # 2. Generate unique filename
         # file_extension = file.filename.split(".")[-1]
@@ -42,95 +53,297 @@ async def upload_report(
         # unique_filename = f"{date}_{user_id}_{appointment_id}_{uuid.uuid4()}.{file_extension}"
 
         # 2. Generate unique filename
-        phone_number = ( phone_number if phone_number.startswith("+91") else "+91" + phone_number)
-        storage_path = (
-            f"phonenumber_{phone_number}/"
-            f"appointment_{appointment_id}/"
-            f"report_{booking_item_id}.pdf"
-        )
-        
-        # 3. Upload to Supabase
-        upload_pdf(file_content=content, storage_path=storage_path, content_type="application/pdf")
-        
-        # 4. Generate signed URL (short expiry, e.g., 1 hour)
-        signed_url = get_signed_url(storage_path, expires_in=3600)
+        phone_number = normalize_phone(phone_number)
+        storage_path = report_storage_path(pdf_stream.content_hash)
 
         order_crud = crud_order.CrudOrder(db)
         user = await crud_user.get_by_phone(db=db, phone=phone_number)
         if not user:
             raise HTTPException(status_code=404, detail="User with this phone number not found")
-        await order_crud.create_order(
-            OrderCreate(
-                user_id=user.id,
-                booking_id=appointment_id,
-                booking_item_id=booking_item_id,
-                file_link=storage_path
-            )
+
+        # 3. Same bytes already on file for this booking item: nothing to do
+        existing = await order_crud.get_by_booking_item_ids([booking_item_id])
+        order = existing.get(booking_item_id)
+        if order is not None and order.content_hash == pdf_stream.content_hash:
+            return {
+                "message": "Report already uploaded",
+                "filename": order.file_link,
+                "signed_url": await get_signed_url(order.file_link, expires_in=3600)
+            }
+
+        # 4. Upload to Supabase, unless another order already stored these bytes
+        if not await order_crud.get_stored_hashes([pdf_stream.content_hash]):
+            await upload_pdf(file_content=pdf_stream, storage_path=storage_path, content_type="application/pdf", upsert=True)
+
+        # 5. Queue the WhatsApp message, committed together with the order. The
+        # worker signs the file when it sends, so retries never carry an expired URL
+        crud_notification.enqueue(
+            db,
+            kind=crud_notification.WHATSAPP_MEDIA,
+            to=phone_number,
+            payload={"body": REPORT_MESSAGE_BODY, "media_path": storage_path},
         )
-        
-        # 5. Send via WhatsApp
-        message_body = "Your medical report is ready. Please find it attached below."
-        send_message_via_twilio_with_media(message_body, phone_number, media_url=signed_url)
-        
+        await order_crud.save_orders(
+            [
+                OrderCreate(
+                    user_id=user.id,
+                    booking_id=appointment_id,
+                    booking_item_id=booking_item_id,
+                    file_link=storage_path,
+                    file_size=pdf_stream.size,
+                    content_hash=pdf_stream.content_hash
+                )
+            ],
+            existing,
+        )
+
+        # 6. Generate signed URL (short expiry, e.g., 1 hour), once the order is saved
+        try:
+            signed_url = await get_signed_url(storage_path, expires_in=3600)
+        except Exception as e:
+            print(f"Error signing report URL: {e}")
+            signed_url = None
+
         return {
-            "message": "Report uploaded and sent successfully",
+            "message": "Report uploaded and queued for sending",
             "filename": storage_path,
             "signed_url": signed_url
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in upload_report: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-from api.deps import get_current_user
-from utils.supabase_storage import list_files
+def _parse_manifest(raw) -> List[ReportManifestEntry]:
+    try:
+        return TypeAdapter(List[ReportManifestEntry]).validate_python(json.loads(raw))
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid manifest: {e}")
+
+
+def _open_zip_batch(archive: UploadFile, manifest: Optional[str]):
+    """
+    Manifest and files of a zip batch. The manifest comes from the form field or,
+    failing that, from manifest.json inside the archive. Members are read lazily.
+    """
+    try:
+        zf = zipfile.ZipFile(archive.file)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Invalid zip archive")
+    if manifest is None:
+        try:
+            manifest = zf.read("manifest.json")
+        except KeyError:
+            raise HTTPException(status_code=400, detail="manifest.json missing from archive")
+    files = {
+        info.filename: UploadFile(file=zf.open(info), size=info.file_size, filename=info.filename)
+        for info in zf.infolist()
+        if not info.is_dir() and info.filename != "manifest.json"
+    }
+    return _parse_manifest(manifest), files
+
+
+@router.post("/upload-reports-bulk")
+async def upload_reports_bulk(
+    manifest: Optional[str] = Form(None),
+    files: List[UploadFile] = File(...),
+    current_user: User = Depends(get_current_admin_or_staff_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Upload a batch of reports, either as several PDFs with a manifest, or as one zip
+    holding the PDFs and (unless the manifest field is given) a manifest.json.
+    The manifest is a JSON list of {filename, appointment_id, booking_item_id, phone_number}.
+    Files are hashed, then each distinct new file is uploaded once, concurrently.
+    Booking items whose report bytes did not change are left alone ("unchanged").
+    Orders and WhatsApp notifications for the rest are committed in one transaction.
+    Returns a result per manifest entry.
+    """
+    if len(files) == 1 and (
+        files[0].content_type in ZIP_CONTENT_TYPES or (files[0].filename or "").lower().endswith(".zip")
+    ):
+        entries, files_by_name = _open_zip_batch(files[0], manifest)
+    else:
+        if manifest is None:
+            raise HTTPException(status_code=400, detail="manifest is required")
+        entries = _parse_manifest(manifest)
+        files_by_name = {file.filename: file for file in files}
+
+    if len(entries) > settings.REPORT_BULK_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.REPORT_BULK_MAX_FILES} reports per batch",
+        )
+
+    order_crud = crud_order.CrudOrder(db)
+    # Validate the whole batch with two queries before any upload
+    users = {
+        user.phone: user
+        for user in await crud_user.get_multi_by_phones(
+            db, [normalize_phone(entry.phone_number) for entry in entries]
+        )
+    }
+    owners = await order_crud.get_booking_item_owners([entry.booking_item_id for entry in entries])
+
+    results = [{"filename": entry.filename, "status": "failed", "detail": None} for entry in entries]
+    pending = {}
+    seen_filenames = set()
+    for index, entry in enumerate(entries):
+        phone_number = normalize_phone(entry.phone_number)
+        user = users.get(phone_number)
+        file = files_by_name.get(entry.filename)
+        if file is None:
+            results[index]["detail"] = "File not found in batch"
+        elif entry.filename in seen_filenames:
+            results[index]["detail"] = "File listed more than once in manifest"
+        elif file.content_type not in (None, "application/pdf"):
+            results[index]["detail"] = "Only PDF files are allowed"
+        elif user is None:
+            results[index]["detail"] = "User with this phone number not found"
+        elif owners.get(entry.booking_item_id) != (entry.appointment_id, user.id):
+            results[index]["detail"] = "Booking item not found for this appointment and user"
+        else:
+            pending[index] = (entry, phone_number, user, file)
+        seen_filenames.add(entry.filename)
+
+    concurrency = asyncio.Semaphore(settings.REPORT_BULK_CONCURRENCY)
+
+    async def open_stream(index: int):
+        try:
+            async with concurrency:
+                return await PDFUploadStream(pending[index][3], MAX_FILE_SIZE).open()
+        except HTTPException as e:
+            results[index]["detail"] = e.detail
+            return None
+
+    opened = dict(zip(pending, await asyncio.gather(*[open_stream(index) for index in pending])))
+    streams = {index: pdf_stream for index, pdf_stream in opened.items() if pdf_stream is not None}
+
+    existing = await order_crud.get_by_booking_item_ids([pending[index][0].booking_item_id for index in streams])
+    stored = await order_crud.get_stored_hashes([pdf_stream.content_hash for pdf_stream in streams.values()])
+
+    # Booking items whose report changed, and each distinct new file once
+    changed = {}
+    to_upload = {}
+    for index, pdf_stream in streams.items():
+        order = existing.get(pending[index][0].booking_item_id)
+        if order is not None and order.content_hash == pdf_stream.content_hash:
+            # Where the order has it, which predates content addressing for old orders
+            results[index]["path"] = order.file_link
+            results[index]["status"] = "unchanged"
+            continue
+        results[index]["path"] = report_storage_path(pdf_stream.content_hash)
+        changed[index] = pdf_stream
+        if pdf_stream.content_hash not in stored:
+            to_upload.setdefault(pdf_stream.content_hash, []).append(index)
+
+    async def upload(content_hash: str, indexes: List[int]):
+        try:
+            async with concurrency:
+                await upload_pdf(
+                    file_content=streams[indexes[0]],
+                    storage_path=report_storage_path(content_hash),
+                    content_type="application/pdf",
+                    upsert=True,
+                )
+        except Exception as e:
+            print(f"Error uploading {pending[indexes[0]][0].filename}: {e}")
+            for index in indexes:
+                results[index]["detail"] = str(e)
+                results[index].pop("path")
+                del changed[index]
+
+    await asyncio.gather(*[upload(content_hash, indexes) for content_hash, indexes in to_upload.items()])
+
+    if changed:
+        orders_in = []
+        for index, pdf_stream in changed.items():
+            entry, phone_number, user, _ = pending[index]
+            crud_notification.enqueue(
+                db,
+                kind=crud_notification.WHATSAPP_MEDIA,
+                to=phone_number,
+                payload={"body": REPORT_MESSAGE_BODY, "media_path": results[index]["path"]},
+            )
+            results[index]["status"] = "uploaded"
+            orders_in.append(
+                OrderCreate(
+                    user_id=user.id,
+                    booking_id=entry.appointment_id,
+                    booking_item_id=entry.booking_item_id,
+                    file_link=results[index]["path"],
+                    file_size=pdf_stream.size,
+                    content_hash=pdf_stream.content_hash
+                )
+            )
+        await order_crud.save_orders(orders_in, existing)
+
+    # Signed once the orders are saved: a signing failure leaves signed_url null on
+    # the entries instead of failing a batch that is already stored
+    signed = [index for index in streams if "path" in results[index]]
+    if signed:
+        try:
+            signed_urls = await get_signed_urls([results[index]["path"] for index in signed], expires_in=3600)
+        except Exception as e:
+            print(f"Error signing bulk report URLs: {e}")
+            signed_urls = {}
+        for index in signed:
+            results[index]["signed_url"] = signed_urls.get(results[index]["path"])
+
+    statuses = [result["status"] for result in results]
+    return {
+        "uploaded": statuses.count("uploaded"),
+        "unchanged": statuses.count("unchanged"),
+        "failed": statuses.count("failed"),
+        "results": results,
+    }
+
+from api.deps import get_current_user, set_next_cursor
 
 @router.get("/")
 async def get_user_reports(
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sign: bool = True,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    List all reports for the current user.
+    List all reports for the current user, newest first.
+    Served from the orders table. With sign=false no storage call is made and url is
+    left empty; fetch it per report from /download-report.
     """
     try:
-        user_folder = f"user_{current_user.id}"
-        
-        # 1. List appointments folders
-        appointments = list_files(user_folder)
-        
-        reports = []
-        
-        if appointments:
-            for appt in appointments:
-                appt_folder_name = appt['name']
-                # Expecting format appointment_{id}
-                if not appt_folder_name.startswith("appointment_"):
-                    continue
-                
-                appt_path = f"{user_folder}/{appt_folder_name}"
-                
-                # 2. List files in appointment folder
-                files = list_files(appt_path)
-                
-                if files:
-                    for file in files:
-                        file_name = file['name']
-                        if file_name.endswith(".pdf"):
-                            file_path = f"{appt_path}/{file_name}"
-                            
-                            # 3. Generate signed URL
-                            signed_url = get_signed_url(file_path, expires_in=3600)
-                            
-                            reports.append({
-                                "filename": file_name,
-                                "path": file_path,
-                                "url": signed_url,
-                                "created_at": file.get("created_at"), # Supabase returns metadata
-                                "appointment_id": appt_folder_name.split("_")[1]
-                            })
-                            
-        return reports
+        order_crud = crud_order.CrudOrder(db)
+        orders = await order_crud.get_reports_by_user(
+            current_user.id, skip=skip, limit=limit, cursor=cursor
+        )
+        set_next_cursor(response, orders, crud_order.REPORT_PAGE_KEYS, limit)
+
+        signed_urls = {}
+        if sign and orders:
+            # One storage call for the whole page
+            signed_urls = await get_signed_urls([order.file_link for order in orders], expires_in=3600)
 
+        return [
+            {
+                "filename": order.file_link.rsplit("/", 1)[-1],
+                "path": order.file_link,
+                "url": signed_urls.get(order.file_link),
+                "size": order.file_size,
+                "created_at": order.created_at,
+                "appointment_id": order.booking_id,
+                "booking_item_id": order.booking_item_id,
+            }
+            for order in orders
+        ]
+
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_user_reports: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -156,9 +369,34 @@ async def download_report(
     if order.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    signed_url = get_signed_url(
+    signed_url = await get_signed_url(
         file_path=order.file_link,
         expires_in=600
     )
 
-    return {"download_url": signed_url}
\ No newline at end of file
+    return {"download_url": signed_url}
+
+
+@router.get("/files/{file_path:path}")
+async def download_local_file(
+    file_path: str,
+    expires: int,
+    signature: str
+):
+    """
+    Serves a file of the local storage backend from its signed URL. The file is
+    sent with FileResponse, which uses the server's pathsend/sendfile support when
+    available instead of reading it through Python.
+    """
+    backend = get_storage_backend()
+    if not isinstance(backend, LocalStorageBackend):
+        raise HTTPException(status_code=404, detail="Not found")
+    if not backend.verify(file_path, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired link")
+    try:
+        path = backend.resolve(file_path)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Not found")
+    return FileResponse(path, media_type="application/pdf", filename=path.name)
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from db.session import get_db
 from schemas.test import Test, TestCreate, TestUpdate
-from crud import crud_test, crud_test_category
+from schemas.test_tag import TagFacet, TestTag, TestTagCreate
+from crud import crud_test, crud_test_category, crud_test_tag, crud_catalog
 from db.models.user import User
 from api import deps
 
@@ -11,13 +12,59 @@ router = APIRouter()
 
 @router.get("/", response_model=List[Test])
 async def read_tests(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None, description="Only tests carrying every given tag"),
+    conditional: deps.ConditionalGet = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
-    tests = await crud_test.get_multi(db, skip=skip, limit=limit)
+    snapshot = await crud_catalog.get_snapshot(db)
+    deps.set_catalog_version(response, snapshot)
+    conditional.check(snapshot.version)
+    tests = await crud_catalog.get_tests(db, skip=skip, limit=limit, cursor=cursor, tags=tag)
+    deps.set_next_cursor(response, tests, crud_test.PAGE_KEYS, limit)
     return tests
 
+@router.get("/catalog-version")
+async def read_catalog_version(
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Version of the tests and categories catalog; it changes whenever either does.
+    """
+    snapshot = await crud_catalog.get_snapshot(db)
+    return {"version": snapshot.version, "built_at": snapshot.built_at}
+
+@router.get("/facets", response_model=List[TagFacet])
+async def read_tag_facets(
+    response: Response,
+    tag: Optional[List[str]] = Query(None, description="Count among tests carrying every given tag"),
+    conditional: deps.ConditionalGet = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Number of tests per tag, among the tests GET /tests/ returns for the same tags.
+    """
+    snapshot = await crud_catalog.get_snapshot(db)
+    deps.set_catalog_version(response, snapshot)
+    conditional.check(snapshot.version)
+    facets = await crud_catalog.get_tag_facets(db, tags=tag)
+    return [{"tag": name, "count": count} for name, count in facets]
+
+@router.get("/search", response_model=List[Test])
+async def search_tests(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Tests matching q by name, sample type, description or category, best first.
+    Words match as prefixes and near-misses in the name are tolerated.
+    """
+    return await crud_catalog.search_tests(db, q, limit=limit)
+
 @router.post("/", response_model=Test)
 async def create_test(
     test_in: TestCreate,
@@ -29,11 +76,16 @@ async def create_test(
 @router.get("/{test_id}", response_model=Test)
 async def read_test(
     test_id: int,
+    response: Response,
+    conditional: deps.ConditionalGet = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
-    test = await crud_test.get(db, id=test_id)
+    test = await crud_catalog.get_test(db, id=test_id)
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
+    snapshot = await crud_catalog.get_snapshot(db)
+    deps.set_catalog_version(response, snapshot)
+    conditional.check(snapshot.version)
     return test
 
 @router.put("/{test_id}", response_model=Test)
@@ -58,4 +110,42 @@ async def delete_test(
     test = await crud_test.get(db, id=test_id)
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
-    return await crud_test.delete(db, id=test_id)
\ No newline at end of file
+    return await crud_test.delete(db, id=test_id)
+
+@router.get("/{test_id}/tags", response_model=List[str])
+async def read_test_tags(
+    test_id: int,
+    response: Response,
+    conditional: deps.ConditionalGet = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    if not await crud_catalog.get_test(db, id=test_id):
+        raise HTTPException(status_code=404, detail="Test not found")
+    snapshot = await crud_catalog.get_snapshot(db)
+    deps.set_catalog_version(response, snapshot)
+    conditional.check(snapshot.version)
+    return await crud_catalog.get_test_tags(db, test_id)
+
+@router.post("/{test_id}/tags", response_model=TestTag)
+async def add_test_tag(
+    test_id: int,
+    tag_in: TestTagCreate,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(deps.get_current_admin_user)
+):
+    test = await crud_test.get(db, id=test_id)
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+    return await crud_test_tag.create(db, test_id=test_id, obj_in=tag_in)
+
+@router.delete("/{test_id}/tags/{tag}", response_model=TestTag)
+async def remove_test_tag(
+    test_id: int,
+    tag: str,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(deps.get_current_admin_user)
+):
+    test_tag = await crud_test_tag.delete(db, test_id=test_id, tag=tag)
+    if not test_tag:
+        raise HTTPException(status_code=404, detail="Tag not found")
+    return test_tag
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from db.session import get_db
 from schemas.user import User, UserCreate, UserUpdate, UserWithPetAndAddressInfo
 from schemas.pet import Pet as PetSchema
@@ -17,30 +17,49 @@ async def read_user_me(
 ):
     return current_user
 
+@router.get("/cache-stats")
+async def read_user_cache_stats(
+    admin: User = Depends(deps.get_current_admin_user),
+):
+    """
+    Hit/miss counters of the authenticated user cache, to size it.
+    """
+    return crud_user.user_cache.stats()
+
 @router.get("/", response_model=List[User])
 async def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    users = await crud_user.get_multi(db, skip=skip, limit=limit)
+    users = await crud_user.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    deps.set_next_cursor(response, users, crud_user.PAGE_KEYS, limit)
     return users
 
 
 @router.get("/all-user-info", response_model=UserWithPetAndAddressInfo)
 async def read_user_with_pet_and_address_info(
+    conditional: deps.ConditionalGet = Depends(),
     current_user: User = Depends(deps.get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get all user information including pets and addresses.
     Returns is_new_user=True if user has no pets and no addresses.
+    Sends an ETag of the rows it is built from and honours If-None-Match.
     """
     # Fetch user's pets
     pets = await crud_pet.get_multi_by_user(db, user_id=current_user.id)
     
     # Fetch user's addresses
     addresses = await crud_address.get_multi_by_user(db, user_id=current_user.id)
+
+    conditional.check(
+        deps.row_version(current_user.id, current_user.full_name, current_user.is_active, *pets, *addresses),
+        private=True,
+    )
     
     # Convert to response format
     pets_data = [PetSchema.model_validate(pet) for pet in pets]
@@ -15,6 +15,28 @@ class Settings(BaseSettings):
     SUPABASE_URL: str | None = None
     SUPABASE_KEY: str | None = None
     SUPABASE_BUCKET: str = "reports"
+    STORAGE_BACKEND: str = "supabase"  # supabase | local
+    LOCAL_STORAGE_ROOT: str = "storage"
+    LOCAL_STORAGE_BASE_URL: str = ""  # prefix for local signed URLs, e.g. https://api.example.com
+    STORAGE_URL_SIGNING_KEY: str = ""  # key for local signed URLs; derived from SECRET_KEY when empty
+    STORAGE_MAX_CONNECTIONS: int = 20
+    STORAGE_MAX_CONCURRENCY: int = 10
+    STORAGE_KEEPALIVE_SECONDS: float = 30.0
+    STORAGE_TIMEOUT_SECONDS: float = 30.0
+    STORAGE_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    SIGNED_URL_CACHE_MAXSIZE: int = 10000
+    SIGNED_URL_REFRESH_MARGIN_SECONDS: int = 120
+    REPORT_BULK_MAX_FILES: int = 500
+    REPORT_BULK_CONCURRENCY: int = 8
+    NOMINATIM_BASE_URL: str = "https://nominatim.openstreetmap.org"
+    NOMINATIM_USER_AGENT: str = "Diagnopet/1.0 (diagnopet.com)"
+    NOMINATIM_TIMEOUT_SECONDS: float = 10.0
+    NOMINATIM_MAX_CONNECTIONS: int = 10
+    GEOCODE_CACHE_MAXSIZE: int = 10000
+    GEOCODE_CACHE_TTL_SECONDS: int = 24 * 3600
+    REVERSE_GEOCODE_PRECISION: int = 8  # geohash characters; 8 is about 38 m x 19 m
+    PINCODE_GAZETTEER_PATH: str | None = "data/pincodes.bin"  # see scripts/build_pincode_gazetteer.py
+    PINCODE_GAZETTEER_REQUIRED: bool = False  # refuse to start without the gazetteer
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 100
@@ -25,6 +47,24 @@ class Settings(BaseSettings):
     ADMIN_NAME: str | None = "Super Admin"
     ADMIN_PHONE: str | None = None
 
+    USER_CACHE_MAXSIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    CATALOG_TTL_SECONDS: int = 300
+    TAG_QUERY_CACHE_MAXSIZE: int = 1024  # tag filter/facet results kept per catalog snapshot
+
+    PASSWORD_HASH_WORKERS: int = 4
+
+    OTP_BACKEND: str = "sql"  # sql | memory | redis
+    REDIS_URL: str | None = None
+
+    NOTIFICATION_WORKER_ENABLED: bool = True
+    NOTIFICATION_TRANSPORT: str = "twilio"  # twilio | fake
+    NOTIFICATION_BATCH_SIZE: int = 20
+    NOTIFICATION_POLL_SECONDS: float = 2.0
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_RETRY_BASE_SECONDS: float = 30.0
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
 
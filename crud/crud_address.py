@@ -3,14 +3,17 @@ from sqlalchemy.future import select
 from typing import List, Optional
 from db.models.address import Address
 from schemas.address import AddressCreate, AddressUpdate
+from crud.pagination import keyset
+
+PAGE_KEYS = (Address.id,)
 
 async def get(db: AsyncSession, id: int) -> Optional[Address]:
     result = await db.execute(select(Address).filter(Address.id == id))
     return result.scalars().first()
 
-async def get_multi_by_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Address]:
+async def get_multi_by_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Address]:
     result = await db.execute(
-        select(Address).filter(Address.user_id == user_id).offset(skip).limit(limit)
+        keyset(select(Address).filter(Address.user_id == user_id), PAGE_KEYS, cursor).offset(skip).limit(limit)
     )
     return result.scalars().all()
 
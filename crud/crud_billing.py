@@ -0,0 +1,100 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import Any, AsyncIterator, Iterable, List
+from db.models.booking import Booking
+from db.models.booking_item import BookingItem
+from db.models.test import Test
+from db.models.user import User
+
+
+def billing_statement(*criteria, order_by=(Booking.booking_date.asc(),)):
+    """
+    One row per booked test (or one row for a booking without tests), carrying the
+    customer and the booking amount. Prices are the ones stored on the booking and
+    its items when it was made, so a billing report is read with a single query.
+    """
+    return (
+        select(
+            Booking.id.label("booking_id"),
+            Booking.booking_date,
+            Booking.status,
+            User.full_name,
+            User.phone,
+            Test.id.label("test_id"),
+            Test.name.label("test_name"),
+            Test.sample_type,
+            BookingItem.price,
+            Booking.total_amount.label("amount"),
+        )
+        .join(User, Booking.user_id == User.id)
+        .outerjoin(BookingItem, BookingItem.booking_id == Booking.id)
+        .outerjoin(Test, BookingItem.test_id == Test.id)
+        .where(*criteria)
+        .order_by(*order_by, Booking.id, BookingItem.id)
+    )
+
+
+def _billing_entry(row: Any) -> dict:
+    return {
+        "booking_id": row.booking_id,
+        "customer": row.full_name,
+        "phone_number": row.phone,
+        "date": row.booking_date,
+        "status": row.status,
+        "tests": [],
+        "amount": row.amount,
+    }
+
+
+def _append_test(entry: dict, row: Any) -> None:
+    if row.test_id is not None:
+        entry["tests"].append({
+            "id": row.test_id,
+            "name": row.test_name,
+            "sample_type": row.sample_type,
+            "price": row.price,
+        })
+
+
+def group_billing_rows(rows: Iterable[Any]):
+    """
+    Fold consecutive rows of the same booking into one billing entry.
+    Rows must be ordered by booking, which billing_statement guarantees.
+    """
+    current = None
+    for row in rows:
+        if current is None or current["booking_id"] != row.booking_id:
+            if current is not None:
+                yield current
+            current = _billing_entry(row)
+        _append_test(current, row)
+    if current is not None:
+        yield current
+
+
+async def get_billing(db: AsyncSession, *criteria, order_by=(Booking.booking_date.asc(),)) -> List[dict]:
+    result = await db.execute(billing_statement(*criteria, order_by=order_by))
+    return list(group_billing_rows(result.all()))
+
+
+async def stream_billing(
+    db: AsyncSession,
+    *criteria,
+    order_by=(Booking.booking_date.asc(),),
+    yield_per: int = 500,
+) -> AsyncIterator[dict]:
+    """
+    Same entries as get_billing, read through a server-side cursor in batches of
+    yield_per rows, so memory stays flat whatever the size of the date range.
+    """
+    stmt = billing_statement(*criteria, order_by=order_by).execution_options(yield_per=yield_per)
+    result = await db.stream(stmt)
+    current = None
+    async for row in result:
+        if current is None or current["booking_id"] != row.booking_id:
+            if current is not None:
+                yield current
+            current = _billing_entry(row)
+        _append_test(current, row)
+    if current is not None:
+        yield current
@@ -1,18 +1,17 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, joinedload
 from typing import List, Optional
 from fastapi import HTTPException
 from db.models.booking import Booking
 from db.models.booking_item import BookingItem
-from db.models.test import Test
 from schemas.booking import BookingCreate, BookingUpdate
 from twilio.rest import Client
 from core.config import settings
-from utils.send_whatsapp_msg import new_send_whatsapp_template_via_twilio
 import json
-from crud import crud_address, crud_test
+from crud import crud_address, crud_test, crud_notification
 from datetime import datetime
+from crud.pagination import keyset
 
 
 account_sid = settings.TWILIO_ACCOUNT_SID
@@ -24,29 +23,73 @@ twilio_client = Client(account_sid, auth_token)
 
 async def get(db: AsyncSession, id: int) -> Optional[Booking]:
     result = await db.execute(
-        select(Booking).options(selectinload(Booking.items)).filter(Booking.id == id)
+        select(Booking)
+        .options(selectinload(Booking.items), selectinload(Booking.address))
+        .filter(Booking.id == id)
     )
     return result.scalars().first()
 
-async def get_multi(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Booking]:
-    result = await db.execute(
-        select(Booking).options(selectinload(Booking.items)).offset(skip).limit(limit)
+# Newest first; cursors seek on (created_at, id)
+PAGE_KEYS = (Booking.created_at, Booking.id)
+
+async def get_multi(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Booking]:
+    stmt = keyset(
+        select(Booking).options(selectinload(Booking.items), selectinload(Booking.address)),
+        PAGE_KEYS,
+        cursor,
+        descending=True,
     )
+    result = await db.execute(stmt.offset(skip).limit(limit))
     return result.scalars().all()
 
-async def get_multi_by_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Booking]:
-    result = await db.execute(
-        select(Booking).options(selectinload(Booking.items)).filter(Booking.user_id == user_id).offset(skip).limit(limit)
+async def get_multi_by_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Booking]:
+    stmt = keyset(
+        select(Booking)
+        .options(selectinload(Booking.items), selectinload(Booking.address))
+        .filter(Booking.user_id == user_id),
+        PAGE_KEYS,
+        cursor,
+        descending=True,
     )
+    result = await db.execute(stmt.offset(skip).limit(limit))
     return result.scalars().all()
+
+async def get_multi_by_user_with_tests(
+    db: AsyncSession,
+    user_id: int,
+    exclude_status: Optional[str] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+) -> List[Booking]:
+    """
+    Bookings of a user with address, items and their tests eagerly loaded.
+    Always two round-trips (bookings + address, items + tests), whatever the number of bookings.
+    """
+    stmt = (
+        select(Booking)
+        .options(
+            joinedload(Booking.address),
+            selectinload(Booking.items).joinedload(BookingItem.test),
+        )
+        .filter(Booking.user_id == user_id)
+        .order_by(Booking.created_at.desc(), Booking.id.desc())
+    )
+    if exclude_status is not None:
+        stmt = stmt.filter(Booking.status != exclude_status)
+    stmt = stmt.offset(skip)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
 async def create(db: AsyncSession, obj_in: BookingCreate, user_id: int) -> Booking:
-    # 0. Validate Test IDs
+    # 0. Validate Test IDs, loading the tests for their prices
     unique_test_ids = list(set(obj_in.test_ids))
-    result = await db.execute(select(Test.id).filter(Test.id.in_(unique_test_ids)))
-    existing_ids = result.scalars().all()
-    
-    if len(existing_ids) != len(unique_test_ids):
-        missing_ids = set(unique_test_ids) - set(existing_ids)
+    tests = await crud_test.get_by_list_of_ids(db, unique_test_ids)
+    tests_by_id = {test.id: test for test in tests}
+
+    if len(tests_by_id) != len(unique_test_ids):
+        missing_ids = set(unique_test_ids) - set(tests_by_id)
         raise HTTPException(status_code=400, detail=f"Tests with IDs {missing_ids} do not exist.")
 
     # 1. Create Booking
@@ -55,39 +98,50 @@ async def create(db: AsyncSession, obj_in: BookingCreate, user_id: int) -> Booki
     db_obj = Booking(**booking_data, user_id=user_id)
     db.add(db_obj)
     await db.flush()
-    # 2. Create BookingItems
+    # 2. Create BookingItems at today's prices, and the booking total with them
     msg = "Tests :"
+    total_amount = 0
     for i, test_id in enumerate(obj_in.test_ids):
-        booking_item = BookingItem(booking_id=db_obj.id, test_id=test_id)
+        test = tests_by_id[test_id]
+        booking_item = BookingItem(
+            booking_id=db_obj.id,
+            test_id=test_id,
+            price=test.price,
+            discounted_price=test.discounted_price,
+        )
         db.add(booking_item)
+        total_amount += test.price
         msg += f"\n{i+1}. {test_id}" 
+    db_obj.total_amount = total_amount
 
-    await db.commit()
-    # 3. notify owner about the booking
+    # 3. notify owner about the booking, queued in the outbox with the booking itself
     from crud import crud_user
     user = await crud_user.get(db, id=user_id)
     user_name = user.full_name if user else "Unknown User"
-    try:
-        content_sid = settings.TEMPLATE_ID  # Your template SID
-        to = "+918639675595"  # Recipient's number
-        address = await crud_address.get(db, obj_in.address_id)
-        if not address or not address.google_maps_link:
-            address_link = "Address link not provided"
-        else:
-            address_link = address.google_maps_link
-        tests = await crud_test.get_by_list_of_ids(db, obj_in.test_ids)
-        tests_names = ""
-        for i, test in enumerate(tests):
-            tests_names += f"{i+1}.{test.name} "
-        user_name_with_date = f'{user_name} on {obj_in.booking_date.strftime("%d-%m-%Y %I:%M %p")}.'
-        content_variables = json.dumps({
-            "1": user_name_with_date,
-            "2": address_link,
-            "3": tests_names,
-        })
-        new_send_whatsapp_template_via_twilio(content_sid, to, content_variables)
-    except Exception as e:
-        print(f"Failed to send WhatsApp message: {e}")
+    content_sid = settings.TEMPLATE_ID  # Your template SID
+    to = "+918639675595"  # Recipient's number
+    address = await crud_address.get(db, obj_in.address_id)
+    if not address or not address.google_maps_link:
+        address_link = "Address link not provided"
+    else:
+        address_link = address.google_maps_link
+    tests_names = ""
+    for i, test in enumerate(tests):
+        tests_names += f"{i+1}.{test.name} "
+    user_name_with_date = f'{user_name} on {obj_in.booking_date.strftime("%d-%m-%Y %I:%M %p")}.'
+    content_variables = json.dumps({
+        "1": user_name_with_date,
+        "2": address_link,
+        "3": tests_names,
+    })
+    crud_notification.enqueue(
+        db,
+        kind=crud_notification.WHATSAPP_TEMPLATE,
+        to=to,
+        payload={"content_sid": content_sid, "content_variables": content_variables},
+    )
+
+    await db.commit()
     return await get(db, db_obj.id)
 
 async def update(db: AsyncSession, db_obj: Booking, obj_in: BookingUpdate) -> Booking:
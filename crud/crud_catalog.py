@@ -0,0 +1,218 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.cache import TTLCache
+from core.config import settings
+from crud.pagination import decode_cursor
+from crud import crud_test, crud_test_tag
+from crud.crud_test import PAGE_KEYS
+from crud.search_index import TestSearchIndex
+from db.models.test import Test as TestModel
+from db.models.test_category import TestCategory as TestCategoryModel
+from db.models.test_tag import TestTag as TestTagModel
+from schemas.test import Test
+from schemas.test_category import TestCategory
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Every test, category and test tag, read in one go. version is a hash of the content, so
+    it is the same in every worker holding the same catalog. tag_queries keeps the
+    answers of the tag filter and facet queries run against this snapshot, and goes
+    away with it.
+    """
+    version: str
+    built_at: float
+    tests: tuple[Test, ...]
+    test_ids: tuple[int, ...]
+    tests_by_id: dict[int, Test]
+    categories: tuple[TestCategory, ...]
+    categories_by_id: dict[int, TestCategory]
+    tags_by_test: dict[int, tuple[str, ...]]
+    tag_queries: TTLCache
+    search_index: TestSearchIndex
+
+
+async def _build(db: AsyncSession) -> CatalogSnapshot:
+    tests = [
+        Test.model_validate(test)
+        for test in (await db.execute(select(TestModel).order_by(TestModel.id))).scalars().all()
+    ]
+    categories = [
+        TestCategory.model_validate(category)
+        for category in (await db.execute(select(TestCategoryModel).order_by(TestCategoryModel.id))).scalars().all()
+    ]
+    tests_by_id = {test.id: test for test in tests}
+    tags_by_test = defaultdict(list)
+    tag_rows = await db.execute(
+        select(TestTagModel.test_id, TestTagModel.tag).order_by(TestTagModel.test_id, TestTagModel.tag)
+    )
+    for test_id, tag in tag_rows.all():
+        if test_id in tests_by_id:
+            tags_by_test[test_id].append(tag)
+    content = json.dumps(
+        {
+            "tests": [test.model_dump(mode="json") for test in tests],
+            "categories": [category.model_dump(mode="json") for category in categories],
+            "tags": sorted(tags_by_test.items()),
+        },
+        sort_keys=True,
+    )
+    categories_by_id = {category.id: category for category in categories}
+    search_index = TestSearchIndex(
+        (
+            test.id,
+            {
+                "name": test.name,
+                "description": test.description,
+                "sample_type": test.sample_type,
+                "category": categories_by_id[test.category_id].name if test.category_id in categories_by_id else None,
+            },
+        )
+        for test in tests
+    )
+    return CatalogSnapshot(
+        version=hashlib.sha256(content.encode("utf-8")).hexdigest()[:16],
+        built_at=time.time(),
+        tests=tuple(tests),
+        test_ids=tuple(test.id for test in tests),
+        tests_by_id=tests_by_id,
+        categories=tuple(categories),
+        categories_by_id=categories_by_id,
+        tags_by_test={test_id: tuple(tags) for test_id, tags in tags_by_test.items()},
+        tag_queries=TTLCache(maxsize=settings.TAG_QUERY_CACHE_MAXSIZE, ttl=settings.CATALOG_TTL_SECONDS),
+        search_index=search_index,
+    )
+
+
+class CatalogCache:
+    """
+    The current snapshot. crud_test and crud_test_category rebuild it after every
+    write; CATALOG_TTL_SECONDS bounds how long a worker can serve a snapshot missing
+    writes made through another worker.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+
+    async def refresh(self, db: AsyncSession) -> CatalogSnapshot:
+        async with self._lock:
+            self._snapshot = await _build(db)
+            self._expires_at = time.monotonic() + self.ttl
+            return self._snapshot
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        if self._snapshot is not None and time.monotonic() < self._expires_at:
+            return self._snapshot
+        async with self._lock:
+            # Someone else may have rebuilt it while we waited
+            if self._snapshot is not None and time.monotonic() < self._expires_at:
+                return self._snapshot
+            self._snapshot = await _build(db)
+            self._expires_at = time.monotonic() + self.ttl
+            return self._snapshot
+
+
+catalog_cache = CatalogCache(ttl=settings.CATALOG_TTL_SECONDS)
+
+
+async def refresh_after_write(db: AsyncSession) -> None:
+    """
+    Rebuild the snapshot after a committed write. The write stands either way: if
+    the rebuild fails the snapshot is only invalidated, and the next read rebuilds it.
+    """
+    try:
+        await catalog_cache.refresh(db)
+    except Exception as e:
+        print(f"Catalog rebuild failed, rebuilding on next read: {e}")
+        catalog_cache.invalidate()
+
+
+async def get_snapshot(db: AsyncSession) -> CatalogSnapshot:
+    return await catalog_cache.get(db)
+
+
+async def _tag_query(snapshot: CatalogSnapshot, kind: str, tags: list[str], fetch):
+    key = (kind, tuple(sorted(tags)))
+    cached = snapshot.tag_queries.get(key)
+    if cached is None:
+        cached = await fetch()
+        snapshot.tag_queries.set(key, cached)
+    return cached
+
+
+async def _tagged_test_ids(db: AsyncSession, snapshot: CatalogSnapshot, tags: list[str]) -> list[int]:
+    test_ids = await _tag_query(snapshot, "tests", tags, lambda: crud_test_tag.get_test_ids_by_tags(db, tags))
+    # Tests added since the snapshot was built are left out, like everywhere else
+    return [test_id for test_id in test_ids if test_id in snapshot.tests_by_id]
+
+
+async def get_tests(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    tags: Optional[list[str]] = None,
+) -> List[Test]:
+    """
+    Same page as crud_test.get_multi, served from the snapshot. With tags, only the
+    tests carrying all of them, found by crud_test_tag.get_test_ids_by_tags.
+    """
+    snapshot = await get_snapshot(db)
+    tags = crud_test_tag.normalize_tags(tags)
+    test_ids = await _tagged_test_ids(db, snapshot, tags) if tags else snapshot.test_ids
+    start = 0
+    if cursor is not None:
+        start = bisect.bisect_right(test_ids, decode_cursor(cursor, PAGE_KEYS)[0])
+    start += skip
+    return [snapshot.tests_by_id[test_id] for test_id in test_ids[start:start + limit]]
+
+
+async def get_test(db: AsyncSession, id: int) -> Optional[Test]:
+    return (await get_snapshot(db)).tests_by_id.get(id)
+
+
+async def get_test_tags(db: AsyncSession, test_id: int) -> List[str]:
+    return list((await get_snapshot(db)).tags_by_test.get(test_id, ()))
+
+
+async def get_tag_facets(db: AsyncSession, tags: Optional[list[str]] = None) -> list[tuple[str, int]]:
+    """
+    crud_test_tag.get_facets, run once per tag filter and catalog snapshot.
+    """
+    snapshot = await get_snapshot(db)
+    tags = crud_test_tag.normalize_tags(tags)
+    return await _tag_query(snapshot, "facets", tags, lambda: crud_test_tag.get_facets(db, tags))
+
+
+async def get_categories(db: AsyncSession) -> List[TestCategory]:
+    return list((await get_snapshot(db)).categories)
+
+
+async def get_category(db: AsyncSession, id: int) -> Optional[TestCategory]:
+    return (await get_snapshot(db)).categories_by_id.get(id)
+
+
+async def search_tests(db: AsyncSession, q: str, limit: int = 20) -> List[Test]:
+    """
+    Ranked test search: Postgres full-text and trigram search, or the snapshot's
+    in-memory index on other databases (SQLite in tests and local runs).
+    """
+    if db.bind.dialect.name == "postgresql":
+        return await crud_test.search(db, q, limit=limit)
+    snapshot = await get_snapshot(db)
+    return [snapshot.tests_by_id[test_id] for test_id in snapshot.search_index.search(q, limit=limit)]
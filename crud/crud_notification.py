@@ -0,0 +1,65 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import List
+from db.models.notification import Notification
+from datetime import datetime, timedelta, timezone
+import json
+
+WHATSAPP_TEMPLATE = "whatsapp_template"
+WHATSAPP_MEDIA = "whatsapp_media"
+
+
+def enqueue(db: AsyncSession, kind: str, to: str, payload: dict) -> Notification:
+    """
+    Add a notification to the outbox. It is not committed here, so it is stored in
+    the same transaction as whatever the caller commits next.
+    """
+    db_obj = Notification(
+        kind=kind,
+        to=to,
+        payload=json.dumps(payload),
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc),
+    )
+    db.add(db_obj)
+    return db_obj
+
+
+async def claim_batch(db: AsyncSession, limit: int) -> List[Notification]:
+    """
+    Lock up to limit due notifications. Rows locked by another worker are skipped,
+    so several workers can drain the outbox together.
+    """
+    result = await db.execute(
+        select(Notification)
+        .filter(
+            Notification.status == "pending",
+            Notification.next_attempt_at <= datetime.now(timezone.utc),
+        )
+        .order_by(Notification.next_attempt_at, Notification.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return result.scalars().all()
+
+
+def mark_sent(notification: Notification) -> None:
+    notification.status = "sent"
+    notification.attempts += 1
+    notification.last_error = None
+    notification.sent_at = datetime.now(timezone.utc)
+
+
+def mark_failed(notification: Notification, error: str, max_attempts: int, retry_base_seconds: float) -> None:
+    """
+    Schedule a retry with exponential backoff, or dead-letter the notification once
+    it has used up max_attempts.
+    """
+    notification.attempts += 1
+    notification.last_error = error[:2000]
+    if notification.attempts >= max_attempts:
+        notification.status = "dead"
+        return
+    delay = retry_base_seconds * 2 ** (notification.attempts - 1)
+    notification.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
@@ -11,9 +11,22 @@ from db.models.address import Address
 from schemas.order import OrderCreate, OrderUpdate
 from twilio.rest import Client
 from core.config import settings
+from crud.pagination import keyset
 from utils.send_whatsapp_msg import new_send_whatsapp_template_via_twilio
 import json
 from datetime import datetime
+import pytz
+
+
+REPORT_PAGE_KEYS = (Order.created_at, Order.id)
+
+
+def report_storage_path(content_hash: str) -> str:
+    """
+    Reports are addressed by content, so identical files are stored once and
+    re-uploading the same bytes is a no-op.
+    """
+    return f"sha256/{content_hash[:2]}/{content_hash}.pdf"
 
 
 class CrudOrder:
@@ -27,6 +40,71 @@ class CrudOrder:
         await self.db.refresh(db_order)
         return db_order
 
+    async def save_orders(self, objs_in: List[OrderCreate], existing: dict) -> List[Order]:
+        """
+        Insert orders, or update the order already in existing (booking_item_id -> Order)
+        for the same booking item, all in one transaction.
+        """
+        existing = dict(existing)
+        db_orders = []
+        for obj_in in objs_in:
+            db_order = existing.get(obj_in.booking_item_id)
+            if db_order is None:
+                db_order = Order(**obj_in.dict())
+                self.db.add(db_order)
+                existing[obj_in.booking_item_id] = db_order
+            else:
+                for key, value in obj_in.dict(exclude_unset=True).items():
+                    setattr(db_order, key, value)
+            db_orders.append(db_order)
+        await self.db.commit()
+        return db_orders
+
+    async def get_by_booking_item_ids(self, booking_item_ids: List[int]) -> dict:
+        """
+        booking_item_id -> its (oldest) order.
+        """
+        if not booking_item_ids:
+            return {}
+        stmt = (
+            select(Order)
+            .where(Order.booking_item_id.in_(set(booking_item_ids)))
+            .order_by(Order.id.desc())
+        )
+        result = await self.db.execute(stmt)
+        return {order.booking_item_id: order for order in result.scalars().all()}
+
+    async def get_stored_hashes(self, content_hashes: List[str]) -> set:
+        """
+        The content hashes some order already references at their content path, i.e.
+        already in storage there. Orders from before content addressing carry a hash
+        but point at an older path, so they don't count.
+        """
+        if not content_hashes:
+            return set()
+        paths = {report_storage_path(content_hash): content_hash for content_hash in set(content_hashes)}
+        stmt = (
+            select(Order.file_link)
+            .where(Order.content_hash.in_(set(content_hashes)), Order.file_link.in_(paths))
+            .distinct()
+        )
+        result = await self.db.execute(stmt)
+        return {paths[file_link] for file_link in result.scalars().all()}
+
+    async def get_booking_item_owners(self, booking_item_ids: List[int]) -> dict:
+        """
+        booking_item_id -> (booking_id, user_id), for validating a batch of uploads in one query.
+        """
+        if not booking_item_ids:
+            return {}
+        stmt = (
+            select(BookingItem.id, BookingItem.booking_id, Booking.user_id)
+            .join(Booking, BookingItem.booking_id == Booking.id)
+            .where(BookingItem.id.in_(set(booking_item_ids)))
+        )
+        result = await self.db.execute(stmt)
+        return {item_id: (booking_id, user_id) for item_id, booking_id, user_id in result.all()}
+
     async def get_order(self, id: int):
         return await self.db.get(Order, id)
 
@@ -60,6 +138,26 @@ class CrudOrder:
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
+    async def get_reports_by_user(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[Order]:
+        """
+        Orders of a user that have an uploaded report, newest first.
+        Served by ix_orders_user_id_created_at_id, without touching storage.
+        """
+        stmt = keyset(
+            select(Order).where(Order.user_id == user_id, Order.file_link.is_not(None)),
+            REPORT_PAGE_KEYS,
+            cursor,
+            descending=True,
+        )
+        result = await self.db.execute(stmt.offset(skip).limit(limit))
+        return result.scalars().all()
+
     async def   get_by_booking_id_and_booking_item_id(self, booking_id: int, booking_item_id: int):
         print("booking item id is ", booking_item_id)
         stmt = select(Order).where(Order.booking_item_id == booking_item_id, Order.booking_id == booking_id)
@@ -120,4 +218,59 @@ class CrudOrder:
                 "file_link": order.file_link
             })
         
-        return list(bookings_dict.values())
\ No newline at end of file
+        return list(bookings_dict.values())
+
+    async def get_bookings_with_tests_by_user(self, user_id: int):
+        """
+        Bookings of a user that have orders, shaped with address, tests and total amount.
+        Everything is read with a single joined query, however many orders the user has.
+        """
+        ist = pytz.timezone("Asia/Kolkata")
+        stmt = (
+            select(Order, Booking, BookingItem, Test, Address)
+            .join(Booking, Order.booking_id == Booking.id)
+            .join(BookingItem, Order.booking_item_id == BookingItem.id)
+            .join(Test, BookingItem.test_id == Test.id)
+            .join(Address, Booking.address_id == Address.id)
+            .where(Order.user_id == user_id)
+            .order_by(Booking.created_at.desc(), Booking.id.desc(), Order.id.asc())
+        )
+        result = await self.db.execute(stmt)
+        rows = result.all()
+
+        bookings_dict = {}
+        for order, booking, booking_item, test, address in rows:
+            if booking.id not in bookings_dict:
+                address_parts = [
+                    part
+                    for part in (
+                        address.address_line1,
+                        address.address_line2,
+                        address.city,
+                        address.state,
+                        address.postal_code,
+                    )
+                    if part
+                ]
+                bookings_dict[booking.id] = {
+                    "id": booking.id,
+                    "booking_date": booking.booking_date.date(),
+                    # Convert UTC to IST for display
+                    "booking_time": booking.booking_date.astimezone(ist).strftime("%I:%M %p"),
+                    "status": booking.status,
+                    "address": ", ".join(address_parts),
+                    "address_link": address.google_maps_link if address.google_maps_link else "",
+                    "tests": [],
+                    "total_amount": booking.total_amount,
+                    "created_at": booking.created_at,
+                }
+
+            bookings_dict[booking.id]["tests"].append({
+                "id": test.id,
+                "name": test.name,
+                "sample_type": test.sample_type,
+                "booking_item_id": booking_item.id,
+                "file_link": order.file_link if order.file_link else None
+            })
+
+        return list(bookings_dict.values())
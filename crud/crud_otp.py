@@ -1,50 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy import func
-from typing import Optional
-from db.models.otp import OTP
-from datetime import datetime, timedelta
+from crud.otp_store import get_otp_backend
 
-async def create_otp(db: AsyncSession, phone: str, otp_code: str, expires_in_minutes: int = 10) -> OTP:
-    expires_at = datetime.utcnow() + timedelta(minutes=expires_in_minutes)
-      
-    
-    db_obj = OTP(
-        phone=phone,
-        otp_code="000000",
-        expires_at=expires_at
-    )
-    db.add(db_obj)
-    await db.commit()
-    await db.refresh(db_obj)
-    return db_obj
+async def create_otp(db: AsyncSession, phone: str, otp_code: str, expires_in_minutes: int = 10) -> None:
+    await get_otp_backend(db).save(phone, "000000", expires_in_minutes * 60)
 
 async def get_recent_otps_count(db: AsyncSession, phone: str, hours: int = 6) -> int:
-    since = datetime.utcnow() - timedelta(hours=hours)
-    result = await db.execute(
-        select(func.count(OTP.id)).filter(
-            OTP.phone == phone,
-            OTP.created_at >= since
-        )
-    )
-    return result.scalar() or 0
+    return await get_otp_backend(db).count_recent(phone, hours * 3600)
 
-async def verify_otp(db: AsyncSession, phone: str, otp_code: str) -> Optional[OTP]:
-    result = await db.execute(
-        select(OTP).filter(
-            OTP.phone == phone,
-            OTP.otp_code == "000000",
-            OTP.is_used == False,
-            OTP.expires_at > datetime.utcnow()
-        )
-    )
-    otp_obj = result.scalars().first()
-    if otp_obj:
-        otp_obj.is_used = True
-        db.add(otp_obj)
-        await db.commit()
-        await db.refresh(otp_obj)
-    return otp_obj
+async def verify_otp(db: AsyncSession, phone: str, otp_code: str) -> bool:
+    return await get_otp_backend(db).verify_and_consume(phone, "000000")
 
 
 def check_phone_number(phone: str) -> tuple[bool, str]:
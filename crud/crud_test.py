@@ -1,9 +1,54 @@
+import re
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import func, literal_column, or_
 from typing import List, Optional
 from db.models.test import Test
+from db.models.test_category import TestCategory
 from db.models.booking_item import BookingItem
 from schemas.test import TestCreate, TestUpdate
+from crud.pagination import keyset
+
+PAGE_KEYS = (Test.id,)
+
+
+# The search documents. They must render exactly like the expressions of the GIN
+# indexes ix_tests_search_document and ix_test_categories_search_document (migration
+# 1b4d6f8a2c37), with constants inlined rather than bound, or Postgres will not use them.
+SIMPLE_CONFIG = literal_column("'simple'::regconfig")
+
+
+def _weighted_document(column, weight: str):
+    return func.setweight(
+        func.to_tsvector(SIMPLE_CONFIG, func.coalesce(column, literal_column("''"))),
+        literal_column(f"'{weight}'"),
+    )
+
+
+SEARCH_DOCUMENT = (
+    _weighted_document(Test.name, "A")
+    .op("||")(_weighted_document(Test.sample_type, "B"))
+    .op("||")(_weighted_document(Test.description, "C"))
+)
+CATEGORY_SEARCH_DOCUMENT = func.to_tsvector(SIMPLE_CONFIG, TestCategory.name)
+# Weight of category-name matches against the test's own document
+CATEGORY_RANK_WEIGHT = 0.4
+
+
+def _prefix_tsquery(q: str) -> Optional[str]:
+    """
+    tsquery text matching every word of q as a prefix, e.g. "liv fun" -> "liv:* & fun:*".
+    """
+    tokens = re.findall(r"[^\W_]+", q.casefold())
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+async def _refresh_catalog(db: AsyncSession) -> None:
+    # Imported here, crud_catalog imports this module
+    from crud import crud_catalog
+    await crud_catalog.refresh_after_write(db)
 
 
 async def get(db: AsyncSession, id: int) -> Optional[Test]:
@@ -22,8 +67,8 @@ async def get_by_list_of_ids(
     return result.scalars().all()
 
 
-async def get_multi(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Test]:
-    result = await db.execute(select(Test).offset(skip).limit(limit))
+async def get_multi(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Test]:
+    result = await db.execute(keyset(select(Test), PAGE_KEYS, cursor).offset(skip).limit(limit))
     return result.scalars().all()
 
 
@@ -32,6 +77,7 @@ async def create(db: AsyncSession, obj_in: TestCreate) -> Test:
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    await _refresh_catalog(db)
     return db_obj
 
 
@@ -43,6 +89,7 @@ async def update(db: AsyncSession, db_obj: Test, obj_in: TestUpdate) -> Test:
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    await _refresh_catalog(db)
     return db_obj
 
 
@@ -51,6 +98,7 @@ async def delete(db: AsyncSession, id: int) -> Optional[Test]:
     if obj:
         await db.delete(obj)
         await db.commit()
+        await _refresh_catalog(db)
     return obj
 
 
@@ -63,3 +111,36 @@ async def get_tests_by_booking_id(db: AsyncSession, booking_id: int) -> List[Tes
     return result.scalars().all()
 
 
+async def search(db: AsyncSession, q: str, limit: int = 20) -> List[Test]:
+    """
+    Postgres search over name, sample type, description and category name: full-text
+    with prefix matching, plus pg_trgm similarity for typos. Ranked by weighted
+    ts_rank plus name similarity.
+    """
+    prefix_query = _prefix_tsquery(q)
+    if prefix_query is None:
+        return []
+    tsquery = func.to_tsquery(SIMPLE_CONFIG, prefix_query)
+    rank = (
+        func.ts_rank(SEARCH_DOCUMENT, tsquery)
+        + CATEGORY_RANK_WEIGHT * func.ts_rank(CATEGORY_SEARCH_DOCUMENT, tsquery)
+        + func.similarity(Test.name, q)
+    )
+    stmt = (
+        select(Test)
+        .join(TestCategory, Test.category_id == TestCategory.id)
+        .where(
+            or_(
+                SEARCH_DOCUMENT.op("@@")(tsquery),
+                CATEGORY_SEARCH_DOCUMENT.op("@@")(tsquery),
+                Test.name.op("%")(q),
+                Test.sample_type.op("%")(q),
+                Test.description.op("%")(q),
+                TestCategory.name.op("%")(q),
+            )
+        )
+        .order_by(rank.desc(), Test.id)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return result.scalars().all()
@@ -3,6 +3,11 @@ from sqlalchemy.future import select
 from typing import List, Optional
 from db.models.test_category import TestCategory
 from schemas.test_category import TestCategoryCreate, TestCategoryUpdate
+from crud import crud_catalog
+
+
+async def _refresh_catalog(db: AsyncSession) -> None:
+    await crud_catalog.refresh_after_write(db)
 
 
 async def get(db: AsyncSession, id: int) -> Optional[TestCategory]:
@@ -32,6 +37,7 @@ async def create(db: AsyncSession, obj_in: TestCategoryCreate) -> TestCategory:
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    await _refresh_catalog(db)
     return db_obj
 
 
@@ -44,6 +50,7 @@ async def update(db: AsyncSession, db_obj: TestCategory, obj_in: TestCategoryUpd
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    await _refresh_catalog(db)
     return db_obj
 
 
@@ -52,4 +59,5 @@ async def delete(db: AsyncSession, id: int) -> Optional[TestCategory]:
     if obj:
         await db.delete(obj)
         await db.commit()
+        await _refresh_catalog(db)
     return obj
@@ -0,0 +1,83 @@
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import distinct, func
+from typing import Iterable, Optional
+from db.models.test_tag import TestTag
+from schemas.test_tag import TestTagCreate
+
+
+async def _refresh_catalog(db: AsyncSession) -> None:
+    # Imported here, crud_catalog imports this module
+    from crud import crud_catalog
+    await crud_catalog.refresh_after_write(db)
+
+
+def normalize_tags(tags: Optional[Iterable[str]]) -> list[str]:
+    """
+    Tags as given in a filter: stripped, without blanks or repeats, in order.
+    """
+    return list(dict.fromkeys(tag.strip() for tag in tags or () if tag and tag.strip()))
+
+
+def _tagged_test_ids(tags: list[str]):
+    # Tests carrying every one of tags; answered from ix_test_tags_tag_test_id
+    return (
+        select(TestTag.test_id)
+        .where(TestTag.tag.in_(tags))
+        .group_by(TestTag.test_id)
+        .having(func.count(distinct(TestTag.tag)) == len(tags))
+    )
+
+
+async def get(db: AsyncSession, test_id: int, tag: str) -> Optional[TestTag]:
+    result = await db.execute(select(TestTag).filter(TestTag.test_id == test_id, TestTag.tag == tag))
+    return result.scalars().first()
+
+
+async def get_test_ids_by_tags(db: AsyncSession, tags: list[str]) -> list[int]:
+    """
+    Ids of the tests carrying every one of tags, ascending. One grouped query.
+    """
+    result = await db.execute(_tagged_test_ids(tags).order_by(TestTag.test_id))
+    return result.scalars().all()
+
+
+async def get_facets(db: AsyncSession, tags: Optional[list[str]] = None) -> list[tuple[str, int]]:
+    """
+    (tag, number of tests) for every tag among the tests carrying all of tags (all
+    tests when none), most common first. One grouped query.
+    """
+    count = func.count(distinct(TestTag.test_id))
+    stmt = select(TestTag.tag, count)
+    if tags:
+        stmt = stmt.where(TestTag.test_id.in_(_tagged_test_ids(tags)))
+    result = await db.execute(stmt.group_by(TestTag.tag).order_by(count.desc(), TestTag.tag))
+    return [(tag, n) for tag, n in result.all()]
+
+
+async def create(db: AsyncSession, test_id: int, obj_in: TestTagCreate) -> TestTag:
+    tag = obj_in.tag.strip()
+    if not tag:
+        raise HTTPException(status_code=400, detail="Tag must not be blank")
+    db_obj = TestTag(test_id=test_id, tag=tag)
+    db.add(db_obj)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # ix_test_tags_tag_test_id is unique, so concurrent adds can't both land
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Test already has tag {tag!r}")
+    await db.refresh(db_obj)
+    await _refresh_catalog(db)
+    return db_obj
+
+
+async def delete(db: AsyncSession, test_id: int, tag: str) -> Optional[TestTag]:
+    obj = await get(db, test_id, tag)
+    if obj:
+        await db.delete(obj)
+        await db.commit()
+        await _refresh_catalog(db)
+    return obj
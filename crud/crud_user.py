@@ -1,14 +1,42 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
 from typing import List, Optional
 from db.models.user import User
 from schemas.user import UserCreate, UserUpdate
-from core.security import get_password_hash
+from core.security import get_password_hash_async
+from core.config import settings
+from core.cache import TTLCache
+from crud.pagination import keyset
+
+PAGE_KEYS = (User.id,)
+
+# Authenticated user lookups, keyed by user id
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAXSIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
 
 async def get(db: AsyncSession, id: int) -> Optional[User]:
     result = await db.execute(select(User).filter(User.id == id))
     return result.scalars().first()
 
+def _detached_copy(user: User) -> User:
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+async def get_cached(db: AsyncSession, id: int) -> Optional[User]:
+    """
+    Same as get, served from user_cache when possible. The cached copy is merged into
+    db without a SELECT, so the returned user belongs to the caller's session.
+    """
+    cached = user_cache.get(id)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    user = await get(db, id)
+    if user:
+        user_cache.set(id, _detached_copy(user))
+    return user
+
 async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
     result = await db.execute(select(User).filter(User.email == email))
     return result.scalars().first()
@@ -17,15 +45,21 @@ async def get_by_phone(db: AsyncSession, phone: str) -> Optional[User]:
     result = await db.execute(select(User).filter(User.phone == phone))
     return result.scalars().first()
 
-async def get_multi(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
-    result = await db.execute(select(User).offset(skip).limit(limit))
+async def get_multi_by_phones(db: AsyncSession, phones: List[str]) -> List[User]:
+    if not phones:
+        return []
+    result = await db.execute(select(User).filter(User.phone.in_(set(phones))))
+    return result.scalars().all()
+
+async def get_multi(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[User]:
+    result = await db.execute(keyset(select(User), PAGE_KEYS, cursor).offset(skip).limit(limit))
     return result.scalars().all()
 
 async def create(db: AsyncSession, obj_in: UserCreate) -> User:
     db_obj = User(
         email=obj_in.email,
         phone=obj_in.phone,
-        hashed_password=get_password_hash(obj_in.password),
+        hashed_password=await get_password_hash_async(obj_in.password),
         full_name=obj_in.full_name,
         is_active=obj_in.is_active,
         is_superuser=obj_in.is_superuser,
@@ -41,7 +75,7 @@ async def create(db: AsyncSession, obj_in: UserCreate) -> User:
 async def update(db: AsyncSession, db_obj: User, obj_in: UserUpdate) -> User:
     update_data = obj_in.model_dump(exclude_unset=True)
     if "password" in update_data and update_data["password"]:
-        hashed_password = get_password_hash(update_data["password"])
+        hashed_password = await get_password_hash_async(update_data["password"])
         del update_data["password"]
         update_data["hashed_password"] = hashed_password
     
@@ -51,6 +85,7 @@ async def update(db: AsyncSession, db_obj: User, obj_in: UserUpdate) -> User:
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    user_cache.invalidate(db_obj.id)
     return db_obj
 
 async def delete(db: AsyncSession, id: int) -> Optional[User]:
@@ -58,4 +93,5 @@ async def delete(db: AsyncSession, id: int) -> Optional[User]:
     if obj:
         await db.delete(obj)
         await db.commit()
+        user_cache.invalidate(id)
     return obj
@@ -0,0 +1,256 @@
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import func, update
+from core.config import settings
+from db.models.otp import OTP
+
+
+class OTPBackend(ABC):
+    """
+    Where OTPs live. Implementations must make verify_and_consume atomic: a code can
+    be consumed once, even with concurrent verifies.
+    """
+
+    @abstractmethod
+    async def save(self, phone: str, otp_code: str, expires_in_seconds: int) -> None:
+        ...
+
+    @abstractmethod
+    async def verify_and_consume(self, phone: str, otp_code: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def count_recent(self, phone: str, window_seconds: int) -> int:
+        """
+        Number of OTPs sent to phone in the last window_seconds (sliding window).
+        """
+        ...
+
+
+class SqlOTPBackend(OTPBackend):
+    """
+    The otps table. Kept as the default and as a fallback.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def save(self, phone: str, otp_code: str, expires_in_seconds: int) -> None:
+        db_obj = OTP(
+            phone=phone,
+            otp_code=otp_code,
+            expires_at=datetime.utcnow() + timedelta(seconds=expires_in_seconds)
+        )
+        self.db.add(db_obj)
+        await self.db.commit()
+
+    async def verify_and_consume(self, phone: str, otp_code: str) -> bool:
+        result = await self.db.execute(
+            select(OTP.id).filter(
+                OTP.phone == phone,
+                OTP.otp_code == otp_code,
+                OTP.is_used == False,
+                OTP.expires_at > datetime.utcnow()
+            )
+        )
+        otp_id = result.scalars().first()
+        if otp_id is None:
+            return False
+        # Conditional update, so only one of two concurrent verifies wins
+        consumed = await self.db.execute(
+            update(OTP).where(OTP.id == otp_id, OTP.is_used == False).values(is_used=True)
+        )
+        await self.db.commit()
+        return consumed.rowcount == 1
+
+    async def count_recent(self, phone: str, window_seconds: int) -> int:
+        since = datetime.utcnow() - timedelta(seconds=window_seconds)
+        result = await self.db.execute(
+            select(func.count(OTP.id)).filter(
+                OTP.phone == phone,
+                OTP.created_at >= since
+            )
+        )
+        return result.scalar() or 0
+
+
+class InMemoryOTPBackend(OTPBackend):
+    """
+    Per-process TTL store. Verification is atomic because nothing awaits between the
+    lookup and the removal. Only suitable when the app runs a single worker.
+    """
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._codes: dict[str, dict[str, float]] = {}
+        self._sent: dict[str, deque] = {}
+        self._saves = 0
+
+    async def save(self, phone: str, otp_code: str, expires_in_seconds: int) -> None:
+        now = time.time()
+        self._codes.setdefault(phone, {})[otp_code] = now + expires_in_seconds
+        self._sent.setdefault(phone, deque()).append(now)
+        self._saves += 1
+        if self._saves % self.SWEEP_EVERY == 0:
+            self._sweep(now)
+
+    async def verify_and_consume(self, phone: str, otp_code: str) -> bool:
+        codes = self._codes.get(phone)
+        if not codes:
+            return False
+        expires_at = codes.pop(otp_code, None)
+        if not codes:
+            del self._codes[phone]
+        return expires_at is not None and expires_at > time.time()
+
+    async def count_recent(self, phone: str, window_seconds: int) -> int:
+        sent = self._sent.get(phone)
+        if not sent:
+            return 0
+        since = time.time() - window_seconds
+        while sent and sent[0] < since:
+            sent.popleft()
+        return len(sent)
+
+    def _sweep(self, now: float) -> None:
+        for phone in list(self._codes):
+            live = {code: exp for code, exp in self._codes[phone].items() if exp > now}
+            if live:
+                self._codes[phone] = live
+            else:
+                del self._codes[phone]
+        # Keep a day of send history, more than any rate limit window we use
+        since = now - 24 * 3600
+        for phone in list(self._sent):
+            sent = self._sent[phone]
+            while sent and sent[0] < since:
+                sent.popleft()
+            if not sent:
+                del self._sent[phone]
+
+
+class RedisOTPBackend(OTPBackend):
+    """
+    Redis (or any server speaking its protocol). Each code is its own key with an
+    expiry, so consuming it is a single atomic DEL. Sends are kept in a sorted set
+    scored by time for sliding-window counting.
+    """
+
+    def __init__(self, client, prefix: str = "otp"):
+        self.client = client
+        self.prefix = prefix
+
+    def _code_key(self, phone: str, otp_code: str) -> str:
+        return f"{self.prefix}:code:{phone}:{otp_code}"
+
+    def _sent_key(self, phone: str) -> str:
+        return f"{self.prefix}:sent:{phone}"
+
+    async def save(self, phone: str, otp_code: str, expires_in_seconds: int) -> None:
+        now = time.time()
+        await self.client.set(self._code_key(phone, otp_code), "1", ex=expires_in_seconds)
+        await self.client.zadd(self._sent_key(phone), {f"{now}:{uuid.uuid4().hex}": now})
+        await self.client.expire(self._sent_key(phone), 24 * 3600)
+
+    async def verify_and_consume(self, phone: str, otp_code: str) -> bool:
+        return await self.client.delete(self._code_key(phone, otp_code)) == 1
+
+    async def count_recent(self, phone: str, window_seconds: int) -> int:
+        key = self._sent_key(phone)
+        await self.client.zremrangebyscore(key, "-inf", time.time() - window_seconds)
+        return await self.client.zcard(key)
+
+
+class FakeRedis:
+    """
+    In-process stand-in for the few Redis commands RedisOTPBackend uses, to exercise
+    it without a server.
+    """
+
+    def __init__(self):
+        self._values: dict[str, str] = {}
+        self._zsets: dict[str, dict[str, float]] = {}
+        self._expiry: dict[str, float] = {}
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expiry.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self._values.pop(key, None)
+            self._zsets.pop(key, None)
+            del self._expiry[key]
+        return key in self._values or key in self._zsets
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+        self._values[key] = value
+        self._expiry.pop(key, None)
+        if ex is not None:
+            self._expiry[key] = time.time() + ex
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                self._values.pop(key, None)
+                self._zsets.pop(key, None)
+                self._expiry.pop(key, None)
+                removed += 1
+        return removed
+
+    async def zadd(self, key: str, mapping: dict) -> int:
+        self._alive(key)
+        zset = self._zsets.setdefault(key, {})
+        added = len([member for member in mapping if member not in zset])
+        zset.update(mapping)
+        return added
+
+    async def zremrangebyscore(self, key: str, min_score, max_score) -> int:
+        if not self._alive(key):
+            return 0
+        low = float(min_score)
+        high = float(max_score)
+        zset = self._zsets[key]
+        doomed = [member for member, score in zset.items() if low <= score <= high]
+        for member in doomed:
+            del zset[member]
+        return len(doomed)
+
+    async def zcard(self, key: str) -> int:
+        return len(self._zsets.get(key, {})) if self._alive(key) else 0
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if not self._alive(key):
+            return False
+        self._expiry[key] = time.time() + seconds
+        return True
+
+
+_memory_backend: Optional[InMemoryOTPBackend] = None
+_redis_backend: Optional[RedisOTPBackend] = None
+
+
+def get_otp_backend(db: AsyncSession) -> OTPBackend:
+    """
+    Backend selected by OTP_BACKEND: "sql" (default), "memory" or "redis".
+    """
+    global _memory_backend, _redis_backend
+    if settings.OTP_BACKEND == "memory":
+        if _memory_backend is None:
+            _memory_backend = InMemoryOTPBackend()
+        return _memory_backend
+    if settings.OTP_BACKEND == "redis":
+        if _redis_backend is None:
+            if not settings.REDIS_URL:
+                raise RuntimeError("OTP_BACKEND=redis needs REDIS_URL")
+            # Optional dependency, only needed for this backend
+            import redis.asyncio as redis
+            _redis_backend = RedisOTPBackend(redis.from_url(settings.REDIS_URL, decode_responses=True))
+        return _redis_backend
+    return SqlOTPBackend(db)
@@ -0,0 +1,63 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Opaque cursor for the sort key of the last row of a page.
+    """
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_value(key: Any, value: Any) -> Any:
+    python_type = key.type.python_type
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise ValueError("cursor value is not a datetime")
+        return datetime.fromisoformat(value)
+    # bool is an int, but never a valid id
+    if not isinstance(value, python_type) or (isinstance(value, bool) and python_type is not bool):
+        raise ValueError(f"cursor value is not {python_type.__name__}")
+    return value
+
+
+def decode_cursor(cursor: str, keys: Sequence[Any]) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, list) or len(payload) != len(keys):
+            raise ValueError("cursor does not match the sort key")
+        return [_decode_value(key, value) for key, value in zip(keys, payload)]
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(stmt, keys: Sequence[Any], cursor: Optional[str] = None, descending: bool = False):
+    """
+    Order the statement by keys and, when a cursor is given, start right after it.
+    The seek is a row-value comparison on an indexed key, so a page costs the same
+    however deep the client scrolls, unlike offset().
+    """
+    if cursor is not None:
+        values = decode_cursor(cursor, keys)
+        if len(keys) == 1:
+            left, right = keys[0], values[0]
+        else:
+            left, right = tuple_(*keys), tuple_(*values)
+        stmt = stmt.where(left < right if descending else left > right)
+    return stmt.order_by(*[key.desc() if descending else key.asc() for key in keys])
+
+
+def next_cursor(items: Sequence[Any], keys: Sequence[Any], limit: int) -> Optional[str]:
+    """
+    Cursor for the page after items, or None when items is the last page.
+    """
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, key.key) for key in keys])
@@ -0,0 +1,95 @@
+import bisect
+import re
+from collections import defaultdict
+from typing import Iterable, Optional
+
+TOKEN = re.compile(r"[^\W_]+")
+
+# Weight of a match in each field, mirroring the setweight() classes of the
+# Postgres search document: name A, sample type and category B, description C
+FIELD_WEIGHTS = {"name": 1.0, "sample_type": 0.4, "category": 0.4, "description": 0.2}
+TRIGRAM_THRESHOLD = 0.3
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return TOKEN.findall(text.casefold()) if text else []
+
+
+def trigrams(text: Optional[str]) -> set[str]:
+    # Same padding as pg_trgm: two spaces before each word, one after
+    grams = set()
+    for word in tokenize(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class TestSearchIndex:
+    """
+    In-memory stand-in for the Postgres full-text + trigram search, used where the
+    database is not Postgres. Every query token must prefix-match some token of a
+    test (name, description, sample type or category name); results are ranked by
+    the weighted fields that matched. Queries with no such match fall back to
+    trigram similarity with each field, to tolerate typos.
+    """
+
+    def __init__(self, documents: Iterable[tuple[int, dict[str, Optional[str]]]]):
+        # token -> {test id: best field weight}
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        # test id -> trigrams of each field, name first
+        self._grams: dict[int, list[set[str]]] = {}
+        for test_id, fields in documents:
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(fields.get(field)):
+                    postings = self._postings[token]
+                    postings[test_id] = max(postings.get(test_id, 0.0), weight)
+            self._grams[test_id] = [trigrams(fields.get(field)) for field in FIELD_WEIGHTS]
+        self._tokens = sorted(self._postings)
+
+    def _prefix_matches(self, prefix: str) -> dict[int, float]:
+        matches: dict[int, float] = {}
+        index = bisect.bisect_left(self._tokens, prefix)
+        while index < len(self._tokens) and self._tokens[index].startswith(prefix):
+            token = self._tokens[index]
+            # Whole-word hits rank above prefix hits
+            factor = 1.0 if token == prefix else 0.7
+            for test_id, weight in self._postings[token].items():
+                matches[test_id] = max(matches.get(test_id, 0.0), weight * factor)
+            index += 1
+        return matches
+
+    def search(self, q: str, limit: int = 20) -> list[int]:
+        """
+        Ids of matching tests, best first.
+        """
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+        scores: Optional[dict[int, float]] = None
+        for token in tokens:
+            matches = self._prefix_matches(token)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {test_id: score + matches[test_id] for test_id, score in scores.items() if test_id in matches}
+            if not scores:
+                break
+        query_grams = trigrams(q)
+        if scores:
+            ranked = {
+                test_id: score + similarity(query_grams, self._grams[test_id][0])
+                for test_id, score in scores.items()
+            }
+        else:
+            ranked = {}
+            for test_id, field_grams in self._grams.items():
+                score = max(similarity(query_grams, grams) for grams in field_grams)
+                if score >= TRIGRAM_THRESHOLD:
+                    ranked[test_id] = score
+        return sorted(ranked, key=lambda test_id: (-ranked[test_id], test_id))[:limit]
@@ -4,7 +4,7 @@ from core.config import settings
 from crud import crud_user
 from schemas.user import UserCreate
 from db.models.user import User
-from core.security import get_password_hash
+from core.security import get_password_hash_async
 
 async def init_db(db: AsyncSession) -> None:
     if settings.ADMIN_EMAIL and settings.ADMIN_PASSWORD:
@@ -43,7 +43,7 @@ async def init_db(db: AsyncSession) -> None:
             user.email = settings.ADMIN_EMAIL
             if settings.ADMIN_PHONE:
                 user.phone = settings.ADMIN_PHONE
-            user.hashed_password = get_password_hash(settings.ADMIN_PASSWORD)
+            user.hashed_password = await get_password_hash_async(settings.ADMIN_PASSWORD)
             user.full_name = settings.ADMIN_NAME
             user.role = "ADMIN"
             user.is_superuser = True
@@ -53,4 +53,5 @@ async def init_db(db: AsyncSession) -> None:
             db.add(user)
             await db.commit()
             await db.refresh(user)
+            crud_user.user_cache.invalidate(user.id)
             print("Admin user updated successfully.")
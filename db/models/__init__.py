@@ -1,9 +1,11 @@
 from .user import User
 from .test_category import TestCategory
 from .test import Test
+from .test_tag import TestTag
 from .booking import Booking
 from .booking_item import BookingItem
 from .otp import OTP
 from .address import Address
 from .pet import Pet
-from .order import Order
\ No newline at end of file
+from .order import Order
+from .notification import Notification
\ No newline at end of file
@@ -1,9 +1,13 @@
-from sqlalchemy import String, Integer, ForeignKey, Text
+from sqlalchemy import String, Integer, ForeignKey, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from db.base import Base
 
 class Address(Base):
     __tablename__ = "addresses"
+    __table_args__ = (
+        # Keyset pagination of a user's addresses
+        Index("ix_addresses_user_id_id", "user_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), index=True)
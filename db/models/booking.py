@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, DateTime, String, Integer
+from sqlalchemy import ForeignKey, DateTime, String, Integer, Index, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from db.base import Base
@@ -10,12 +10,21 @@ if TYPE_CHECKING:
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Range scans for the billing dashboards (date window, optionally with status)
+        Index("ix_bookings_booking_date_status", "booking_date", "status"),
+        # Keyset pagination, newest first
+        Index("ix_bookings_created_at_id", "created_at", "id"),
+        Index("ix_bookings_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     address_id: Mapped[int] = mapped_column(ForeignKey("addresses.id"), index=True)
     booking_date: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     status: Mapped[str] = mapped_column(String(50), default="confirmed", index=True)
+    # Sum of the items' price, set with the items in crud_booking.create
+    total_amount: Mapped[float] = mapped_column(Numeric(10, 2), default=0, server_default="0")
     
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
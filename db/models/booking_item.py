@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer
+from sqlalchemy import ForeignKey, Integer, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from db.base import Base
 
@@ -8,6 +8,9 @@ class BookingItem(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     booking_id: Mapped[int] = mapped_column(ForeignKey("bookings.id", ondelete="CASCADE"), index=True)
     test_id: Mapped[int] = mapped_column(ForeignKey("tests.id", ondelete="CASCADE"), index=True)
+    # The test's prices when it was booked; later catalog changes don't touch them
+    price: Mapped[float] = mapped_column(Numeric(10, 2))
+    discounted_price: Mapped[float | None] = mapped_column(Numeric(10, 2))
 
     booking: Mapped["Booking"] = relationship(back_populates="items")
     test: Mapped["Test"] = relationship()
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, String, DateTime
+from sqlalchemy import ForeignKey, Integer, String, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from db.base import Base
@@ -7,12 +7,20 @@ from typing import Optional
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Report listing: a user's orders newest first, keyset paginated
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Content-addressed report dedup
+        Index("ix_orders_content_hash", "content_hash"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     booking_id: Mapped[int] = mapped_column(ForeignKey("bookings.id", ondelete="CASCADE"), index=True)
     booking_item_id: Mapped[int] = mapped_column(ForeignKey("booking_items.id", ondelete="CASCADE"), index=True)
     file_link: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    file_size: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
@@ -1,13 +1,18 @@
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from db.base import Base
 
 class TestTag(Base):
     __tablename__ = "test_tags"
+    __table_args__ = (
+        # A tag at most once per test. Serves tag filters and facet counts, and
+        # covers lookups by tag alone
+        Index("ix_test_tags_tag_test_id", "tag", "test_id", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     test_id: Mapped[int] = mapped_column(
         ForeignKey("tests.id", ondelete="CASCADE"),
         index=True
     )
-    tag: Mapped[str] = mapped_column(String(50), index=True)
+    tag: Mapped[str] = mapped_column(String(50))
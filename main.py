@@ -8,12 +8,25 @@ from contextlib import asynccontextmanager
 from db.session import AsyncSessionLocal
 from db.init_db import init_db
 from api.v1.endpoints import pet
+from utils.notification_worker import NotificationWorker, build_transport
+from utils import storage, geocoding, pincode_gazetteer
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with AsyncSessionLocal() as session:
         await init_db(session)
+    notification_worker = None
+    if settings.NOTIFICATION_WORKER_ENABLED:
+        notification_worker = NotificationWorker(AsyncSessionLocal, build_transport())
+        notification_worker.start()
+    geocoding.get_client()
+    pincode_gazetteer.load_gazetteer()
     yield
+    if notification_worker is not None:
+        await notification_worker.stop()
+    await storage.close()
+    await geocoding.close_client()
+    pincode_gazetteer.close_gazetteer()
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -30,6 +43,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # GET, POST, PUT, DELETE, etc.
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Catalog-Version", "ETag"],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional, List
+from decimal import Decimal
 
 
 class BookingItemBase(BaseModel):
@@ -15,6 +16,8 @@ class BookingItem(BookingItemBase):
     id: int
     booking_id: int
     test_name: Optional[str] = None
+    price: Optional[Decimal] = None
+    discounted_price: Optional[Decimal] = None
 
     class Config:
         from_attributes = True
@@ -41,6 +44,7 @@ class BookingInDBBase(BookingBase):
     user_id: int
     created_at: datetime
     updated_at: datetime
+    total_amount: Decimal = Decimal("0")
     items: List[BookingItem] = []
 
     class Config:
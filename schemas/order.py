@@ -8,6 +8,8 @@ class OrderBase(BaseModel):
     booking_id: int
     booking_item_id: int
     file_link: Optional[str] = None
+    file_size: Optional[int] = None
+    content_hash: Optional[str] = None
 
 class OrderCreate(OrderBase):
     file_link: Optional[str] = None
@@ -26,6 +28,12 @@ class OrderInDBBase(OrderBase):
 class Order(OrderInDBBase):
     pass
 
+class ReportManifestEntry(BaseModel):
+    filename: str
+    appointment_id: int
+    booking_item_id: int
+    phone_number: str
+
 # Response schema for detailed order information
 class TestDetail(BaseModel):
     test_id: int
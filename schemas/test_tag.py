@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+
+
+class TestTagBase(BaseModel):
+    tag: str = Field(..., min_length=1, max_length=50)
+
+
+class TestTagCreate(TestTagBase):
+    pass
+
+
+class TestTagInDBBase(TestTagBase):
+    id: int
+    test_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class TestTag(TestTagInDBBase):
+    pass
+
+
+class TagFacet(BaseModel):
+    tag: str
+    count: int
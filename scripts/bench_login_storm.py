@@ -0,0 +1,77 @@
+import asyncio
+import sys
+import os
+import time
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from main import app
+from core.security import get_password_hash, verify_password, verify_password_async
+
+# Login storm benchmark.
+# Fires concurrent password checks, the way /auth/login does, while probing an
+# unrelated endpoint (GET /) on the same event loop, and reports the probe latency.
+# With bcrypt on the loop the probe waits behind every hash; with the async variant
+# it should stay flat.
+
+LOGINS = 20
+PROBE_INTERVAL = 0.01
+
+password = "pass123456"
+hashed_password = get_password_hash(password)
+
+
+async def sync_login():
+    return verify_password(password, hashed_password)
+
+
+async def async_login():
+    return await verify_password_async(password, hashed_password)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def probe(client: httpx.AsyncClient, latencies: list, stop: asyncio.Event):
+    # Latency is measured from when the probe was due, so time spent waiting for a
+    # blocked loop counts against it.
+    while not stop.is_set():
+        due = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        response = await client.get("/")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - due) * 1000)
+
+
+async def run(name: str, login):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, latencies, stop))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        await asyncio.gather(*[login() for _ in range(LOGINS)])
+        storm_s = time.perf_counter() - start
+        stop.set()
+        await probe_task
+
+    print(
+        f"{name:<14} logins={LOGINS} storm={storm_s:.2f}s probes={len(latencies)} "
+        f"p50={percentile(latencies, 50):.1f}ms p99={percentile(latencies, 99):.1f}ms "
+        f"max={max(latencies):.1f}ms"
+    )
+
+
+async def main():
+    await run("bcrypt on loop", sync_login)
+    await run("bcrypt offload", async_login)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+import argparse
+import csv
+import os
+import sys
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pincode_gazetteer import HEADER, MAGIC, RECORD, pack_record
+
+# Builds the PIN code gazetteer read by utils/pincode_gazetteer.py from a CSV of post
+# offices, e.g. the India Post "All India Pincode Directory" from data.gov.in.
+# Needed columns (case-insensitive): pincode, district (or city), statename (or state),
+# latitude, longitude. Offices are grouped by PIN code: the city and state are the
+# most common ones among its offices and the centroid is the mean of their coordinates.
+#
+#   python scripts/build_pincode_gazetteer.py pincodes.csv data/pincodes.bin
+
+
+def column(row: dict, *names: str) -> str:
+    for name in names:
+        value = row.get(name)
+        if value:
+            return value.strip()
+    return ""
+
+
+def coordinate(value: str):
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if number else None
+
+
+def most_common(values: list) -> str:
+    return max(set(values), key=values.count) if values else ""
+
+
+def build(csv_path: str, out_path: str) -> int:
+    places = {}
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        for row in reader:
+            pincode = column(row, "pincode")
+            if len(pincode) != 6 or not pincode.isdigit():
+                continue
+            place = places.setdefault(int(pincode), {"cities": [], "states": [], "coords": []})
+            place["cities"].append(column(row, "district", "city").title())
+            place["states"].append(column(row, "statename", "state").title())
+            lat, lon = coordinate(column(row, "latitude")), coordinate(column(row, "longitude"))
+            # Directory rows sometimes have lat/lon missing or out of India's bounds
+            if lat is not None and lon is not None and 6 <= lat <= 38 and 68 <= lon <= 98:
+                place["coords"].append((lat, lon))
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "wb") as out:
+        out.write(HEADER.pack(MAGIC, len(places), RECORD.size))
+        for pincode in sorted(places):
+            place = places[pincode]
+            coords = place["coords"]
+            lat = sum(c[0] for c in coords) / len(coords) if coords else 0.0
+            lon = sum(c[1] for c in coords) / len(coords) if coords else 0.0
+            out.write(pack_record(pincode, lat, lon, most_common(place["cities"]), most_common(place["states"])))
+    return len(places)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the PIN code gazetteer")
+    parser.add_argument("csv_path")
+    parser.add_argument("out_path", nargs="?", default="data/pincodes.bin")
+    args = parser.parse_args()
+    count = build(args.csv_path, args.out_path)
+    print(f"Wrote {count} PIN codes to {args.out_path}")
@@ -0,0 +1,55 @@
+import asyncio
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from core.config import settings
+from crud.crud_billing import billing_statement
+from db.models.booking import Booking
+from utils.date_windows import ist_window, window_criteria
+
+# Checks that the billing dashboards filter bookings with index range scans.
+# Runs EXPLAIN against the configured Postgres database for every date window.
+# Sequential scans are disabled for the check, so on a small development table
+# the planner still shows whether the index is usable for the filter at all.
+
+INDEX_NAME = "ix_bookings_booking_date_status"
+
+
+def billing_criteria(name: str) -> list:
+    criteria = window_criteria(Booking.booking_date, ist_window(name))
+    if name == "pending":
+        criteria.append(Booking.status == "confirmed")
+    return criteria
+
+
+async def main():
+    engine = create_async_engine(settings.DATABASE_URL, echo=False)
+    failures = []
+    async with engine.connect() as conn:
+        await conn.execute(text("SET enable_seqscan = off"))
+        for name in ["today", "month", "pending", "future"]:
+            stmt = billing_statement(*billing_criteria(name))
+            sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            result = await conn.execute(text(f"EXPLAIN {sql}"))
+            plan = "\n".join(row[0] for row in result)
+
+            print(f"--- {name} ---")
+            print(plan)
+            if INDEX_NAME not in plan or "Index Cond" not in plan:
+                failures.append(name)
+    await engine.dispose()
+
+    if failures:
+        print(f"FAILURE: no index range scan on bookings for {failures}")
+        sys.exit(1)
+    print(f"SUCCESS: every billing window uses {INDEX_NAME}.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
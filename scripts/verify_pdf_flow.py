@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 
@@ -5,18 +6,19 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from dotenv import load_dotenv
-from utils.supabase_storage import upload_pdf, get_signed_url
+from core.config import settings
+from utils.storage import upload_pdf, get_signed_url, close
 from utils.send_whatsapp_msg import send_message_via_twilio_with_media
 
 load_dotenv()
 
-def test_flow():
-    # 1. Test Supabase Upload
-    print("Testing Supabase Upload...")
+async def test_flow():
+    # 1. Test Upload (STORAGE_BACKEND=local runs the whole flow offline)
+    print(f"Testing Upload ({settings.STORAGE_BACKEND})...")
     test_content = b"%PDF-1.4 test content"
     test_filename = "test_report.pdf"
     try:
-        res = upload_pdf(test_content, test_filename)
+        res = await upload_pdf(test_content, test_filename, upsert=True)
         print(f"Upload successful: {res}")
     except Exception as e:
         print(f"Upload failed: {e}")
@@ -25,7 +27,7 @@ def test_flow():
     # 2. Test Signed URL Generation
     print("\nTesting Signed URL Generation...")
     try:
-        signed_url = get_signed_url(test_filename, expires_in=60)
+        signed_url = await get_signed_url(test_filename, expires_in=60)
         print(f"Signed URL: {signed_url}")
     except Exception as e:
         print(f"Signed URL generation failed: {e}")
@@ -47,5 +49,11 @@ def test_flow():
     else:
         print("\nSkipping WhatsApp test (TEST_PHONE_NUMBER not set in .env)")
 
+async def main():
+    try:
+        await test_flow()
+    finally:
+        await close()
+
 if __name__ == "__main__":
-    test_flow()
+    asyncio.run(main())
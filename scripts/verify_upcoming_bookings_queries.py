@@ -0,0 +1,103 @@
+import asyncio
+import sys
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from core.config import settings
+from db.models import User, Address, TestCategory, Test, Booking, BookingItem, Order
+from crud.crud_order import CrudOrder
+
+# Regression benchmark for /bookings/upcoming-bookings.
+# Seeds N orders inside a transaction that is rolled back at the end, so it is
+# safe to point at a development database, and checks that the number of
+# queries issued by the batched read path does not grow with N.
+
+ORDER_COUNTS = [1, 10, 100, 500]
+
+engine = create_async_engine(settings.DATABASE_URL, echo=False)
+statements = []
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+async def seed(db: AsyncSession, n_orders: int, suffix: str) -> int:
+    user = User(
+        phone=f"+91bench{suffix}",
+        email=f"bench{suffix}@diagnopet.com",
+        hashed_password="x",
+        full_name="Bench User",
+    )
+    db.add(user)
+    await db.flush()
+    address = Address(
+        user_id=user.id, address_line1="1 Bench Street", city="Hyderabad",
+        state="Telangana", postal_code="500001",
+    )
+    category = TestCategory(name=f"Bench Category {suffix}")
+    db.add_all([address, category])
+    await db.flush()
+    test = Test(category_id=category.id, name="Bench Test", price=100, sample_type="Blood")
+    db.add(test)
+    await db.flush()
+
+    # Two orders per booking, like a booking with two reported tests
+    now = datetime.now(timezone.utc)
+    for i in range(0, n_orders, 2):
+        items = min(2, n_orders - i)
+        booking = Booking(
+            user_id=user.id, address_id=address.id, booking_date=now + timedelta(days=i),
+            total_amount=test.price * items,
+        )
+        db.add(booking)
+        await db.flush()
+        for _ in range(items):
+            item = BookingItem(booking_id=booking.id, test_id=test.id, price=test.price)
+            db.add(item)
+            await db.flush()
+            db.add(Order(user_id=user.id, booking_id=booking.id, booking_item_id=item.id))
+    await db.flush()
+    return user.id
+
+
+async def main():
+    query_counts = []
+    async with engine.connect() as conn:
+        for n_orders in ORDER_COUNTS:
+            trans = await conn.begin()
+            try:
+                db = AsyncSession(bind=conn, expire_on_commit=False)
+                user_id = await seed(db, n_orders, suffix=str(n_orders))
+
+                statements.clear()
+                start = time.perf_counter()
+                bookings = await CrudOrder(db).get_bookings_with_tests_by_user(user_id=user_id)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+
+                query_counts.append(len(statements))
+                print(
+                    f"orders={n_orders:<5} bookings={len(bookings):<5} "
+                    f"queries={len(statements):<3} time={elapsed_ms:.1f}ms"
+                )
+                await db.close()
+            finally:
+                await trans.rollback()
+    await engine.dispose()
+
+    if len(set(query_counts)) == 1:
+        print("SUCCESS: query count is constant as the number of orders grows.")
+    else:
+        print(f"FAILURE: query count grows with the number of orders: {query_counts}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
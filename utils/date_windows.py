@@ -0,0 +1,58 @@
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional, Tuple
+from dateutil.relativedelta import relativedelta
+import pytz
+
+IST = pytz.timezone("Asia/Kolkata")
+
+DateWindow = Tuple[Optional[datetime], Optional[datetime]]
+
+
+def _ist_midnight_utc(day) -> datetime:
+    return IST.localize(datetime.combine(day, time.min)).astimezone(timezone.utc)
+
+
+def ist_window(name: str, now: Optional[datetime] = None) -> DateWindow:
+    """
+    Half-open [start, end) UTC range for a named window, with day and month
+    boundaries taken in Asia/Kolkata. None means the side is unbounded.
+      today   -> IST midnight today .. IST midnight tomorrow
+      month   -> IST midnight on the 1st .. IST midnight on the 1st of next month
+      pending -> .. now
+      future  -> now ..
+    """
+    now = (now or datetime.now(timezone.utc)).astimezone(IST)
+    if name == "today":
+        return _ist_midnight_utc(now.date()), _ist_midnight_utc(now.date() + timedelta(days=1))
+    if name == "month":
+        first_day = now.date().replace(day=1)
+        return _ist_midnight_utc(first_day), _ist_midnight_utc(first_day + relativedelta(months=1))
+    if name == "pending":
+        return None, now.astimezone(timezone.utc)
+    if name == "future":
+        return now.astimezone(timezone.utc), None
+    raise ValueError(f"Unknown date window: {name}")
+
+
+def window_criteria(column, window: DateWindow) -> list:
+    """
+    Plain range predicates on the column, so an index on it can be range-scanned.
+    """
+    start, end = window
+    criteria = []
+    if start is not None:
+        criteria.append(column >= start)
+    if end is not None:
+        criteria.append(column < end)
+    return criteria
+
+
+def parse_ist_datetime(value: str) -> datetime:
+    """
+    Parse an ISO date time string to UTC. A trailing Z or an explicit offset is
+    honoured; a naive value is taken to be IST.
+    """
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00") if value.endswith("Z") else value)
+    if dt.tzinfo is None:
+        dt = IST.localize(dt)
+    return dt.astimezone(timezone.utc)
@@ -0,0 +1,132 @@
+import asyncio
+import httpx
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from core.cache import TTLCache
+from core.config import settings
+
+# App-lifetime connection pool to Nominatim, opened and closed from the app lifespan
+_client: Optional[httpx.AsyncClient] = None
+
+geocode_cache = TTLCache(maxsize=settings.GEOCODE_CACHE_MAXSIZE, ttl=settings.GEOCODE_CACHE_TTL_SECONDS)
+# Reverse lookups keyed by geohash cell, so nearby taps on the map share an entry
+reverse_geocode_cache = TTLCache(maxsize=settings.GEOCODE_CACHE_MAXSIZE, ttl=settings.GEOCODE_CACHE_TTL_SECONDS)
+# Upstream calls in progress, so concurrent identical lookups share one request
+_in_flight: dict[Hashable, asyncio.Task] = {}
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=settings.NOMINATIM_BASE_URL.rstrip("/"),
+            headers={"User-Agent": settings.NOMINATIM_USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=settings.NOMINATIM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.NOMINATIM_MAX_CONNECTIONS,
+            ),
+            timeout=settings.NOMINATIM_TIMEOUT_SECONDS,
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def normalize_query(q: str) -> str:
+    return " ".join(q.casefold().split())
+
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_cell(lat: float, lon: float, precision: int) -> tuple[str, float, float]:
+    """
+    Geohash of (lat, lon) with precision characters, and the centre of that cell.
+    Precision 8 is a cell of about 38 m x 19 m.
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+    return "".join(chars), (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+async def _fetch(path: str, params: dict) -> Any:
+    res = await get_client().get(path, params={**params, "format": "json"})
+    res.raise_for_status()
+    try:
+        return res.json()
+    except ValueError as e:
+        # e.g. an HTML rate-limit page served with 200; an upstream failure like any other
+        raise httpx.DecodingError(f"Invalid JSON from Nominatim: {e}", request=res.request) from e
+
+
+async def _load(cache: TTLCache, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    value = await fetch()
+    cache.set(key, value)
+    return value
+
+
+async def cached_lookup(cache: TTLCache, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Value for key from cache, else from fetch(). Only one fetch per key runs at a
+    time; concurrent callers wait for it. Failures are not cached.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(_load(cache, key, fetch))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # A waiter going away (client disconnect) must not cancel the shared request
+    return await asyncio.shield(task)
+
+
+async def search(q: str) -> Any:
+    q = normalize_query(q)
+    return await cached_lookup(geocode_cache, ("search", q), lambda: _fetch("/search", {"q": q}))
+
+
+async def reverse(lat: float, lon: float) -> Any:
+    """
+    Reverse geocode of the geohash cell (lat, lon) falls in, at
+    REVERSE_GEOCODE_PRECISION. Upstream is asked about the cell centre, so every
+    point of a cell gets the same answer.
+    """
+    cell, cell_lat, cell_lon = geohash_cell(lat, lon, settings.REVERSE_GEOCODE_PRECISION)
+    return await cached_lookup(
+        reverse_geocode_cache,
+        ("reverse", cell),
+        lambda: _fetch("/reverse", {"lat": round(cell_lat, 7), "lon": round(cell_lon, 7)}),
+    )
+
+
+def cache_stats() -> dict:
+    return {
+        "search": geocode_cache.stats(),
+        "reverse": {**reverse_geocode_cache.stats(), "precision": settings.REVERSE_GEOCODE_PRECISION},
+    }
@@ -0,0 +1,135 @@
+import asyncio
+import json
+from typing import Optional
+from core.config import settings
+from crud import crud_notification
+from db.models.notification import Notification
+from utils import storage
+
+# Lifetime of the report URL signed for each send attempt
+MEDIA_URL_EXPIRES_IN = 3600
+
+
+class TwilioTransport:
+    """
+    Sends outbox notifications through Twilio. Errors are raised, not swallowed, so
+    the worker can retry. The Twilio client is blocking, so it runs in a thread.
+    Media payloads carry a storage path, signed afresh on every attempt.
+    """
+
+    def _send(self, kind: str, to: str, payload: dict) -> None:
+        from utils.send_whatsapp_msg import twilio_client, twilio_whatsapp_number
+
+        message_params = {
+            "from_": "whatsapp:" + twilio_whatsapp_number.strip(),
+            "to": "whatsapp:" + to.strip(),
+        }
+        if kind == crud_notification.WHATSAPP_TEMPLATE:
+            message_params["content_sid"] = payload["content_sid"]
+            if payload.get("content_variables"):
+                message_params["content_variables"] = payload["content_variables"]
+        elif kind == crud_notification.WHATSAPP_MEDIA:
+            message_params["body"] = payload["body"]
+            if payload.get("media_url"):
+                message_params["media_url"] = [payload["media_url"]]
+        else:
+            raise ValueError(f"Unknown notification kind: {kind}")
+        twilio_client.messages.create(**message_params)
+
+    async def send(self, kind: str, to: str, payload: dict) -> None:
+        if payload.get("media_path"):
+            media_url = await storage.get_signed_url(payload["media_path"], expires_in=MEDIA_URL_EXPIRES_IN, fresh=True)
+            payload = {**payload, "media_url": media_url}
+        await asyncio.to_thread(self._send, kind, to, payload)
+
+
+class FakeTwilioTransport:
+    """
+    Records what would have been sent. fail_times makes the next sends raise, to
+    exercise retries and dead-lettering.
+    """
+
+    def __init__(self, fail_times: int = 0):
+        self.sent = []
+        self.fail_times = fail_times
+
+    async def send(self, kind: str, to: str, payload: dict) -> None:
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("fake transport failure")
+        self.sent.append({"kind": kind, "to": to, "payload": payload})
+
+
+class NotificationWorker:
+    """
+    Drains the notification outbox in batches on the event loop.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        transport,
+        batch_size: int = settings.NOTIFICATION_BATCH_SIZE,
+        poll_interval: float = settings.NOTIFICATION_POLL_SECONDS,
+        max_attempts: int = settings.NOTIFICATION_MAX_ATTEMPTS,
+        retry_base_seconds: float = settings.NOTIFICATION_RETRY_BASE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.transport = transport
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    async def _deliver(self, notification: Notification) -> None:
+        try:
+            await self.transport.send(notification.kind, notification.to, json.loads(notification.payload))
+        except Exception as e:
+            print(f"Failed to send notification {notification.id}: {e}")
+            crud_notification.mark_failed(notification, str(e), self.max_attempts, self.retry_base_seconds)
+        else:
+            crud_notification.mark_sent(notification)
+
+    async def run_once(self) -> int:
+        """
+        Send one batch of due notifications. Returns how many were processed.
+        """
+        async with self.session_factory() as db:
+            batch = await crud_notification.claim_batch(db, self.batch_size)
+            if not batch:
+                return 0
+            await asyncio.gather(*[self._deliver(notification) for notification in batch])
+            await db.commit()
+            return len(batch)
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                print(f"Notification worker error: {e}")
+                processed = 0
+            # Keep draining while batches come back full
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+
+def build_transport():
+    if settings.NOTIFICATION_TRANSPORT == "fake":
+        return FakeTwilioTransport()
+    return TwilioTransport()
@@ -0,0 +1,55 @@
+import hashlib
+from typing import AsyncIterator
+from fastapi import HTTPException, UploadFile
+
+PDF_MAGIC = b"%PDF-"
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class PDFUploadStream:
+    """
+    Reads an uploaded PDF one chunk at a time so it can be streamed to storage
+    without holding the whole file. open() makes a first pass over the local spool
+    that checks the magic bytes, enforces the size limit and computes the sha256,
+    so the content hash is known before anything is sent; iterating then streams
+    the file from the start.
+    """
+
+    def __init__(self, file: UploadFile, max_size: int, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.file = file
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+    @property
+    def content_hash(self) -> str:
+        return self._sha256.hexdigest()
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(status_code=400, detail="PDF too large")
+
+    async def open(self) -> "PDFUploadStream":
+        if self.file.size is not None and self.file.size > self.max_size:
+            raise self._too_large()
+        while True:
+            chunk = await self.file.read(self.chunk_size)
+            if not chunk:
+                break
+            if self.size == 0 and not chunk.startswith(PDF_MAGIC):
+                raise HTTPException(status_code=400, detail="File is not a valid PDF")
+            self.size += len(chunk)
+            if self.size > self.max_size:
+                raise self._too_large()
+            self._sha256.update(chunk)
+        if self.size == 0:
+            raise HTTPException(status_code=400, detail="File is not a valid PDF")
+        await self.file.seek(0)
+        return self
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self.file.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
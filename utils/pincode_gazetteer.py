@@ -0,0 +1,179 @@
+import mmap
+import struct
+from typing import Optional
+from core.config import settings
+
+# File layout, little endian:
+#   header: magic (8 bytes), record count (uint32), record size (uint16), 2 bytes padding
+#   records, sorted by PIN code: pincode (uint32), lat (float32), lon (float32),
+#   city (48 bytes), state (32 bytes); strings UTF-8, NUL padded
+MAGIC = b"PINGAZ1\0"
+HEADER = struct.Struct("<8sIH2x")
+RECORD = struct.Struct("<Iff48s32s")
+PINCODE_DIGITS = 6
+
+
+def pack_record(pincode: int, lat: float, lon: float, city: str, state: str) -> bytes:
+    return RECORD.pack(
+        pincode, lat, lon,
+        city.encode("utf-8")[:48], state.encode("utf-8")[:32],
+    )
+
+
+def _same_place(a: Optional[str], b: str) -> Optional[bool]:
+    if not a:
+        return None
+    return " ".join(a.casefold().split()) == b.casefold()
+
+
+class PincodeGazetteer:
+    """
+    Indian PIN code -> city, state and centroid, read from a memory-mapped file built
+    by scripts/build_pincode_gazetteer.py. Lookups are binary searches over the
+    mapped records, so nothing is parsed up front and pages are shared between
+    worker processes.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a PIN code gazetteer")
+        magic, self.count, record_size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a PIN code gazetteer")
+        if len(self._mm) < HEADER.size + self.count * RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def _pincode_at(self, index: int) -> int:
+        return struct.unpack_from("<I", self._mm, HEADER.size + index * RECORD.size)[0]
+
+    def _record(self, index: int) -> dict:
+        pincode, lat, lon, city, state = RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+        has_centroid = lat != 0 or lon != 0
+        return {
+            "postal_code": f"{pincode:06d}",
+            # Names were cut to the field width, possibly inside a character
+            "city": city.rstrip(b"\0").decode("utf-8", "ignore"),
+            "state": state.rstrip(b"\0").decode("utf-8", "ignore"),
+            "lat": round(lat, 5) if has_centroid else None,
+            "lon": round(lon, 5) if has_centroid else None,
+        }
+
+    def _lower_bound(self, pincode: int) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._pincode_at(mid) < pincode:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, postal_code: str) -> Optional[dict]:
+        postal_code = postal_code.strip()
+        if len(postal_code) != PINCODE_DIGITS or not postal_code.isdigit():
+            return None
+        pincode = int(postal_code)
+        index = self._lower_bound(pincode)
+        if index < self.count and self._pincode_at(index) == pincode:
+            return self._record(index)
+        return None
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> list[dict]:
+        """
+        PIN codes starting with prefix, in order.
+        """
+        prefix = prefix.strip()
+        if not prefix or len(prefix) > PINCODE_DIGITS or not prefix.isdigit():
+            return []
+        low = int(prefix.ljust(PINCODE_DIGITS, "0"))
+        high = int(prefix.ljust(PINCODE_DIGITS, "9"))
+        results = []
+        index = self._lower_bound(low)
+        while index < self.count and len(results) < limit and self._pincode_at(index) <= high:
+            results.append(self._record(index))
+            index += 1
+        return results
+
+    def validate(self, postal_code: str, city: Optional[str] = None, state: Optional[str] = None) -> dict:
+        """
+        Whether postal_code exists and, when given, whether city and state agree
+        with it. city_matches/state_matches are None when not checked.
+        """
+        record = self.lookup(postal_code)
+        if record is None:
+            return {"postal_code": postal_code, "valid": False, "city_matches": None, "state_matches": None, "expected": None}
+        return {
+            "postal_code": record["postal_code"],
+            "valid": True,
+            "city_matches": _same_place(city, record["city"]),
+            "state_matches": _same_place(state, record["state"]),
+            "expected": record,
+        }
+
+    def as_geocode_result(self, record: dict) -> list[dict]:
+        """
+        record shaped like a Nominatim search result, for /geocode.
+        """
+        return [{
+            "lat": str(record["lat"]),
+            "lon": str(record["lon"]),
+            "display_name": f"{record['city']}, {record['state']}, {record['postal_code']}, India",
+            "class": "place",
+            "type": "postcode",
+            "address": {
+                "city": record["city"],
+                "state": record["state"],
+                "postcode": record["postal_code"],
+                "country": "India",
+                "country_code": "in",
+            },
+        }]
+
+
+_gazetteer: Optional[PincodeGazetteer] = None
+
+
+def load_gazetteer() -> Optional[PincodeGazetteer]:
+    """
+    Map PINCODE_GAZETTEER_PATH. Without a usable file the gazetteer is disabled, with
+    a warning at startup: the /pincodes endpoints answer 503 and /geocode sends PIN
+    codes to Nominatim like any other query. With PINCODE_GAZETTEER_REQUIRED startup
+    fails instead.
+    """
+    global _gazetteer
+    if _gazetteer is None and settings.PINCODE_GAZETTEER_PATH:
+        try:
+            _gazetteer = PincodeGazetteer(settings.PINCODE_GAZETTEER_PATH)
+        except (OSError, ValueError) as e:
+            if settings.PINCODE_GAZETTEER_REQUIRED:
+                raise RuntimeError(f"PIN code gazetteer {settings.PINCODE_GAZETTEER_PATH} could not be loaded: {e}") from e
+            print(
+                f"WARNING: PIN code gazetteer disabled ({e}). The /pincodes endpoints "
+                f"will return 503 until it is built with "
+                f"scripts/build_pincode_gazetteer.py <csv> {settings.PINCODE_GAZETTEER_PATH}"
+            )
+    return _gazetteer
+
+
+def get_gazetteer() -> Optional[PincodeGazetteer]:
+    return _gazetteer
+
+
+def close_gazetteer() -> None:
+    global _gazetteer
+    if _gazetteer is not None:
+        _gazetteer.close()
+        _gazetteer = None
@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+import hmac
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterable, Optional, Union
+from urllib.parse import quote, urlencode
+from core.config import settings
+from utils import supabase_storage
+
+FileContent = Union[bytes, AsyncIterable[bytes]]
+
+
+class StorageBackend(ABC):
+    """
+    Where report files live. Paths are relative to the backend's bucket/root.
+    """
+
+    @abstractmethod
+    async def upload_pdf(self, file_content: FileContent, storage_path: str, content_type: str = "application/pdf", upsert: bool = False):
+        ...
+
+    @abstractmethod
+    async def get_signed_url(self, file_path: str, expires_in: int = 3600, fresh: bool = False) -> str:
+        ...
+
+    @abstractmethod
+    async def get_signed_urls(self, file_paths: list[str], expires_in: int = 3600) -> dict[str, Optional[str]]:
+        ...
+
+    @abstractmethod
+    async def list_files(self, path: str) -> list[dict]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class SupabaseStorageBackend(StorageBackend):
+    """
+    Supabase Storage over its REST API, see utils/supabase_storage.
+    """
+
+    async def upload_pdf(self, file_content: FileContent, storage_path: str, content_type: str = "application/pdf", upsert: bool = False):
+        return await supabase_storage.upload_pdf(file_content, storage_path, content_type=content_type, upsert=upsert)
+
+    async def get_signed_url(self, file_path: str, expires_in: int = 3600, fresh: bool = False) -> str:
+        return await supabase_storage.get_signed_url(file_path, expires_in=expires_in, fresh=fresh)
+
+    async def get_signed_urls(self, file_paths: list[str], expires_in: int = 3600) -> dict[str, Optional[str]]:
+        return await supabase_storage.get_signed_urls(file_paths, expires_in=expires_in)
+
+    async def list_files(self, path: str) -> list[dict]:
+        return await supabase_storage.list_files(path)
+
+    async def close(self) -> None:
+        await supabase_storage.close_client()
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Files on local disk under root, for running the report flow offline and for
+    load tests. Signed URLs point at our own download route and carry an HMAC of
+    the path and expiry, checked by verify().
+    """
+
+    def __init__(self, root: str, secret: bytes, base_url: str = ""):
+        self.root = Path(root).resolve()
+        self.secret = secret
+        self.base_url = base_url.rstrip("/")
+
+    def resolve(self, file_path: str) -> Path:
+        """
+        Absolute path of file_path, refusing anything that escapes root.
+        """
+        path = (self.root / file_path).resolve()
+        if not path.is_relative_to(self.root) or path == self.root:
+            raise ValueError(f"Invalid storage path: {file_path}")
+        return path
+
+    def _signature(self, file_path: str, expires: int) -> str:
+        message = f"{file_path}:{expires}".encode("utf-8")
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def verify(self, file_path: str, expires: int, signature: str) -> bool:
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(file_path, expires), signature)
+
+    async def upload_pdf(self, file_content: FileContent, storage_path: str, content_type: str = "application/pdf", upsert: bool = False):
+        path = self.resolve(storage_path)
+        if path.exists() and not upsert:
+            raise Exception(f"File already exists: {storage_path}")
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        # Write next to the target and rename, so readers never see a partial file
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{id(file_content)}.tmp")
+        handle = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            if isinstance(file_content, bytes):
+                await asyncio.to_thread(handle.write, file_content)
+            else:
+                async for chunk in file_content:
+                    await asyncio.to_thread(handle.write, chunk)
+            await asyncio.to_thread(handle.close)
+            await asyncio.to_thread(os.replace, tmp_path, path)
+        except BaseException:
+            handle.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return {"Key": storage_path}
+
+    async def get_signed_url(self, file_path: str, expires_in: int = 3600, fresh: bool = False) -> str:
+        # Always signed on the spot, so always fresh
+        expires = int(time.time()) + expires_in
+        query = urlencode({"expires": expires, "signature": self._signature(file_path, expires)})
+        return f"{self.base_url}{settings.API_V1_STR}/reports/files/{quote(file_path)}?{query}"
+
+    async def get_signed_urls(self, file_paths: list[str], expires_in: int = 3600) -> dict[str, Optional[str]]:
+        return {file_path: await self.get_signed_url(file_path, expires_in) for file_path in file_paths}
+
+    def _list(self, path: str) -> list[dict]:
+        folder = self.resolve(path) if path else self.root
+        if not folder.is_dir():
+            return []
+        files = []
+        for entry in sorted(folder.iterdir(), key=lambda entry: entry.name):
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                files.append({"name": entry.name, "id": None, "created_at": None, "metadata": None})
+                continue
+            stat = entry.stat()
+            files.append({
+                "name": entry.name,
+                "id": entry.name,
+                "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+                "metadata": {"size": stat.st_size},
+            })
+        return files
+
+    async def list_files(self, path: str) -> list[dict]:
+        return await asyncio.to_thread(self._list, path)
+
+
+_backend: Optional[StorageBackend] = None
+
+
+def url_signing_key() -> bytes:
+    """
+    STORAGE_URL_SIGNING_KEY, or a key derived from SECRET_KEY for this one use, so
+    download URLs are never signed with the JWT key itself.
+    """
+    if settings.STORAGE_URL_SIGNING_KEY:
+        return settings.STORAGE_URL_SIGNING_KEY.encode("utf-8")
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), b"local-storage-urls", hashlib.sha256).digest()
+
+
+def get_storage_backend() -> StorageBackend:
+    """
+    Backend selected by STORAGE_BACKEND: "supabase" (default) or "local".
+    """
+    global _backend
+    if _backend is None:
+        if settings.STORAGE_BACKEND == "local":
+            _backend = LocalStorageBackend(
+                settings.LOCAL_STORAGE_ROOT,
+                url_signing_key(),
+                base_url=settings.LOCAL_STORAGE_BASE_URL,
+            )
+        else:
+            _backend = SupabaseStorageBackend()
+    return _backend
+
+
+async def upload_pdf(file_content: FileContent, storage_path: str, content_type: str = "application/pdf", upsert: bool = False):
+    return await get_storage_backend().upload_pdf(file_content, storage_path, content_type=content_type, upsert=upsert)
+
+
+async def get_signed_url(file_path: str, expires_in: int = 3600, fresh: bool = False) -> str:
+    return await get_storage_backend().get_signed_url(file_path, expires_in=expires_in, fresh=fresh)
+
+
+async def get_signed_urls(file_paths: list[str], expires_in: int = 3600) -> dict[str, Optional[str]]:
+    return await get_storage_backend().get_signed_urls(file_paths, expires_in=expires_in)
+
+
+async def list_files(path: str) -> list[dict]:
+    return await get_storage_backend().list_files(path)
+
+
+async def close() -> None:
+    if _backend is not None:
+        await _backend.close()
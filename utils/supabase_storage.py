@@ -1,49 +1,162 @@
-from supabase import create_client, Client
+import asyncio
+import httpx
+from typing import AsyncIterable, Optional, Union
+from core.cache import TTLCache
 from core.config import settings
-import io
 
 supabase_url = settings.SUPABASE_URL
 supabase_key = settings.SUPABASE_KEY
 supabase_bucket = settings.SUPABASE_BUCKET
 
-supabase: Client = create_client(supabase_url, supabase_key)
+# One keep-alive connection pool for the whole app, created on first use and closed
+# from the app lifespan. The semaphore caps concurrent storage calls per worker.
+_client: Optional[httpx.AsyncClient] = None
+_concurrency = asyncio.Semaphore(settings.STORAGE_MAX_CONCURRENCY)
 
-def upload_pdf(file_content: bytes, storage_path: str, content_type: str = "application/pdf"):
+# Signed URLs keyed by (file_path, expires_in). Each entry lives until
+# SIGNED_URL_REFRESH_MARGIN_SECONDS before the URL itself expires, so a reused URL
+# always has at least that long left.
+signed_url_cache = TTLCache(maxsize=settings.SIGNED_URL_CACHE_MAXSIZE, ttl=0)
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=f"{supabase_url.rstrip('/')}/storage/v1",
+            headers={"Authorization": f"Bearer {supabase_key}", "apikey": supabase_key},
+            limits=httpx.Limits(
+                max_connections=settings.STORAGE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.STORAGE_MAX_CONNECTIONS,
+                keepalive_expiry=settings.STORAGE_KEEPALIVE_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.STORAGE_TIMEOUT_SECONDS,
+                connect=settings.STORAGE_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _request(method: str, url: str, **kwargs) -> httpx.Response:
+    async with _concurrency:
+        res = await get_client().request(method, url, **kwargs)
+    if res.is_error:
+        raise Exception(f"Supabase storage error {res.status_code}: {res.text}")
+    return res
+
+
+async def upload_pdf(
+    file_content: Union[bytes, AsyncIterable[bytes]],
+    storage_path: str,
+    content_type: str = "application/pdf",
+    upsert: bool = False,
+):
     """
-    Uploads a PDF to Supabase Storage.
+    Uploads a PDF to Supabase Storage. file_content may be an async iterable of
+    chunks, which is sent with chunked transfer encoding as it is produced.
     """
     try:
-        res = supabase.storage.from_(supabase_bucket).upload(
-            path=storage_path,
-            file=file_content,
-            file_options={"content-type": content_type, "upsert": False}
+        res = await _request(
+            "POST",
+            f"/object/{supabase_bucket}/{storage_path}",
+            content=file_content,
+            headers={"content-type": content_type, "x-upsert": "true" if upsert else "false"},
         )
-        return res
+        return res.json()
     except Exception as e:
         print(f"Error uploading to Supabase: {e}")
         raise e
 
-def get_signed_url(file_path: str, expires_in: int = 3600):
+def _full_url(signed_path: str) -> str:
+    return f"{supabase_url.rstrip('/')}/storage/v1/{signed_path.lstrip('/')}"
+
+
+def _cache_signed_url(file_path: str, expires_in: int, url: str) -> None:
+    ttl = expires_in - settings.SIGNED_URL_REFRESH_MARGIN_SECONDS
+    if ttl > 0:
+        signed_url_cache.set((file_path, expires_in), url, ttl=ttl)
+
+
+async def get_signed_url(file_path: str, expires_in: int = 3600, fresh: bool = False):
     """
-    Generates a temporary signed URL for a file in Supabase Storage.
+    Generates a temporary signed URL for a file in Supabase Storage. A cached URL
+    may have as little as SIGNED_URL_REFRESH_MARGIN_SECONDS left; pass fresh=True
+    when the URL must be valid for the whole expires_in.
     """
+    cached = None if fresh else signed_url_cache.get((file_path, expires_in))
+    if cached is not None:
+        return cached
     try:
-        res = supabase.storage.from_(supabase_bucket).create_signed_url(
-            path=file_path,
-            expires_in=expires_in
+        res = await _request(
+            "POST",
+            f"/object/sign/{supabase_bucket}/{file_path}",
+            json={"expiresIn": expires_in},
         )
-        return res['signedURL']
+        url = _full_url(res.json()["signedURL"])
+        _cache_signed_url(file_path, expires_in, url)
+        return url
     except Exception as e:
         print(f"Error generating signed URL: {e}")
         raise e
 
-def list_files(path: str):
+async def get_signed_urls(file_paths: list[str], expires_in: int = 3600) -> dict[str, Optional[str]]:
+    """
+    Signed URLs for many files, with one storage call for all the ones not cached.
+    Files storage could not sign (e.g. missing) map to None.
+    """
+    urls: dict[str, Optional[str]] = {}
+    missing = []
+    for file_path in dict.fromkeys(file_paths):
+        cached = signed_url_cache.get((file_path, expires_in))
+        if cached is not None:
+            urls[file_path] = cached
+        else:
+            missing.append(file_path)
+    if not missing:
+        return urls
+    try:
+        res = await _request(
+            "POST",
+            f"/object/sign/{supabase_bucket}",
+            json={"expiresIn": expires_in, "paths": missing},
+        )
+    except Exception as e:
+        print(f"Error generating signed URLs: {e}")
+        raise e
+    for item in res.json():
+        if item.get("error") or not item.get("signedURL"):
+            continue
+        url = _full_url(item["signedURL"])
+        urls[item["path"]] = url
+        _cache_signed_url(item["path"], expires_in, url)
+    for file_path in missing:
+        urls.setdefault(file_path, None)
+    return urls
+
+async def list_files(path: str):
     """
     Lists files in a specific path in Supabase Storage.
     """
     try:
-        res = supabase.storage.from_(supabase_bucket).list(path)
-        return res
+        res = await _request(
+            "POST",
+            f"/object/list/{supabase_bucket}",
+            json={
+                "prefix": path,
+                "limit": 100,
+                "offset": 0,
+                "sortBy": {"column": "name", "order": "asc"},
+            },
+        )
+        return res.json()
     except Exception as e:
         print(f"Error listing files in Supabase: {e}")
         raise e